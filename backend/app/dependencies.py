@@ -0,0 +1,34 @@
+from functools import lru_cache
+from app.services.vector_store import VectorStoreService
+from app.services.llm import LLMService
+from app.services.semantic_cache import SemanticCache
+from app.services.answer_cache import AnswerCache
+from app.services.reranker import RerankerService
+
+# Each factory builds its service once per worker process; FastAPI injects
+# the shared instance through Depends
+
+async def clear_answer_caches():
+    """Cached answers may no longer match the document set once it changes"""
+    await get_semantic_cache().clear()
+    get_answer_cache().clear()
+
+@lru_cache(maxsize=1)
+def get_vector_store() -> VectorStoreService:
+    return VectorStoreService(on_change=clear_answer_caches)
+
+@lru_cache(maxsize=1)
+def get_llm_service() -> LLMService:
+    return LLMService()
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticCache:
+    return SemanticCache()
+
+@lru_cache(maxsize=1)
+def get_answer_cache() -> AnswerCache:
+    return AnswerCache()
+
+@lru_cache(maxsize=1)
+def get_reranker() -> RerankerService:
+    return RerankerService()
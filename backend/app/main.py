@@ -1,15 +1,26 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Query
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 import os
+import json
+import uuid
 import logging
 import re
+from collections import OrderedDict
+import numpy as np
 
 from app.routes import documents, chat
 from app.services.vector_store import VectorStoreService
 from app.services.llm import LLMService
+from app.services.semantic_cache import SemanticCache
+from app.services.answer_cache import AnswerCache
+from app.services.reranker import RerankerService
+from app.utils.tokens import fit_to_token_budget
+from app.utils.uploads import read_upload
+from app.dependencies import get_vector_store, get_llm_service, get_semantic_cache, get_answer_cache, get_reranker
 
 load_dotenv()
 
@@ -17,11 +28,20 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="DocChat RAG API", version="1.0.0")
+# Number of chunks retrieved per question, read once at startup
+MAX_RESULTS = int(os.getenv("MAX_RESULTS", "1"))
 
-# Initialize services
-vector_store = VectorStoreService()
-llm_service = LLMService()
+# Token budget for retrieved context sent to the LLM
+MAX_CONTEXT_TOKENS = int(os.getenv("MAX_CONTEXT_TOKENS", "1500"))
+
+# Upload statuses kept for polling; the oldest finished ones are dropped first
+UPLOAD_STATUS_SIZE = int(os.getenv("UPLOAD_STATUS_SIZE", "1000"))
+
+# Matches "Topic X-Y" references in questions
+_TOPIC_RE = re.compile(r'Topic\s+(\d+)-(\d+)', re.IGNORECASE)
+
+# orjson serializes the source-heavy /ask responses much faster than stdlib json
+app = FastAPI(title="DocChat RAG API", version="1.0.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -57,105 +77,177 @@ class AskResponse(BaseModel):
     answer: str
     sources: List[Source] = []
 
+PREVIEW_LENGTH = 150
+
+def _make_preview(text: str) -> str:
+    """First PREVIEW_LENGTH characters of a chunk, with an ellipsis when cut"""
+    # Short chunks (the common case) are used as-is, without slicing
+    if len(text) <= PREVIEW_LENGTH:
+        return text.strip()
+    return text[:PREVIEW_LENGTH].strip() + "..."
+
+NO_DOCUMENTS_ANSWER = "No documents found. Please upload some documents first to ask questions about them."
+
+def _dedupe_chunks(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Drop repeated chunks, keeping the first (most relevant) occurrence
+    Chunks are identified by (filename, chunk_index)
+    """
+    seen = set()
+    deduped = []
+    for chunk in chunks:
+        metadata = chunk["metadata"]
+        key = (metadata.get("filename"), metadata.get("chunk_index"))
+        if key in seen:
+            continue
+        seen.add(key)
+        deduped.append(chunk)
+    
+    if len(deduped) < len(chunks):
+        logger.info("Dropped %d duplicate chunks", len(chunks) - len(deduped))
+    return deduped
+
+async def _retrieve_context(
+    question: str,
+    question_embedding: np.ndarray,
+    topic_match: Optional[re.Match],
+    vector_store: VectorStoreService,
+    model: str,
+    reranker: RerankerService
+) -> Tuple[str, List[Source]]:
+    """
+    Search for the chunks relevant to a question
+    Returns: (context, sources), both empty when no documents match
+    """
+    # With a reranker, over-fetch candidates and let it pick the final MAX_RESULTS
+    search_k = reranker.candidates if reranker.enabled else MAX_RESULTS
+    
+    # Log retrieval configuration
+    if topic_match:
+        topic_label = f"Topic {topic_match.group(1)}-{topic_match.group(2)}"
+        logger.info("Retrieval config: k=%d, regex matched topic=%s", MAX_RESULTS, topic_label)
+    else:
+        logger.info("Retrieval config: k=%d, no topic regex match", MAX_RESULTS)
+    
+    # Search for relevant document chunks with configured k
+    relevant_chunks = []
+    if topic_match:
+        # Restrict the search to chunks tagged with the requested topic
+        relevant_chunks = await vector_store.search(
+            query=question,
+            top_k=search_k,
+            query_embedding=question_embedding,
+            metadata_filter={"topic": topic_label}
+        )
+        if relevant_chunks:
+            logger.info("Filtered to %d chunks matching topic=%s", len(relevant_chunks), topic_label)
+        else:
+            logger.info("No exact topic match for %s, using top %d result(s)", topic_label, MAX_RESULTS)
+    
+    if not relevant_chunks:
+        relevant_chunks = await vector_store.search(
+            query=question,
+            top_k=search_k,
+            query_embedding=question_embedding
+        )
+    
+    if not relevant_chunks:
+        logger.warning("No documents found in ChromaDB")
+        return "", []
+    
+    relevant_chunks = _dedupe_chunks(relevant_chunks)
+    
+    if reranker.enabled:
+        relevant_chunks = await reranker.rerank(question, relevant_chunks, MAX_RESULTS)
+    
+    # Keep the most relevant chunks that fit the prompt token budget; results
+    # arrive sorted by relevance, so anything dropped is the least relevant
+    chunk_texts = fit_to_token_budget([chunk["text"] for chunk in relevant_chunks], MAX_CONTEXT_TOKENS, model)
+    if len(chunk_texts) < len(relevant_chunks):
+        logger.info("Dropped %d chunks over the %d token budget", len(relevant_chunks) - len(chunk_texts), MAX_CONTEXT_TOKENS)
+        relevant_chunks = relevant_chunks[:len(chunk_texts)]
+    
+    logger.info("Retrieved %d final chunks", len(relevant_chunks))
+    
+    # Per-chunk traces for debugging; skipped entirely unless DEBUG is on
+    if logger.isEnabledFor(logging.DEBUG):
+        for i, chunk in enumerate(relevant_chunks):
+            metadata = chunk["metadata"]
+            logger.debug("  Chunk %d: %s (chunk %s) topic=%s - distance: %s",
+                         i + 1,
+                         metadata.get('filename', 'Unknown'),
+                         metadata.get('chunk_index', 'N/A'),
+                         metadata.get('topic', 'None'),
+                         chunk.get('distance', 'N/A'))
+    
+    # Convert distances to similarity scores (0-100) in one vectorized pass
+    distances = np.fromiter(
+        (chunk.get("distance", 1.0) for chunk in relevant_chunks),
+        dtype=np.float64,
+        count=len(relevant_chunks)
+    )
+    scores = np.clip((1.0 - distances) * 100.0, 0.0, None).round(1).tolist()
+    
+    # Fields come straight from our own metadata, so skip validation.
+    # Empty topics and zero page/line numbers are stored as placeholders
+    metadatas = [chunk["metadata"] for chunk in relevant_chunks]
+    sources = [
+        Source.model_construct(
+            filename=metadata.get("filename", "Unknown"),
+            topic=metadata.get("topic") or None,
+            page=metadata.get("page") or None,
+            line=metadata.get("line") or None,
+            preview=_make_preview(chunk_text),
+            score=score
+        )
+        for metadata, chunk_text, score in zip(metadatas, chunk_texts, scores)
+    ]
+    
+    # The budgeted texts are already the context, in relevance order
+    return "\n\n".join(chunk_texts), sources
+
 @app.post("/ask", response_model=AskResponse)
-async def ask_question(request: AskRequest):
+async def ask_question(
+    request: AskRequest,
+    vector_store: VectorStoreService = Depends(get_vector_store),
+    llm_service: LLMService = Depends(get_llm_service),
+    semantic_cache: SemanticCache = Depends(get_semantic_cache),
+    answer_cache: AnswerCache = Depends(get_answer_cache),
+    reranker: RerankerService = Depends(get_reranker)
+):
     """
     Answer questions using RAG (Retrieval-Augmented Generation)
     """
     try:
-        logger.info(f"Processing question: {request.question}")
+        logger.info("Processing question: %s", request.question)
         
-        # Get MAX_RESULTS from environment, default to 1
-        max_results = int(os.getenv("MAX_RESULTS", "1"))
+        # Repeated questions are answered without embedding them again
+        cached = answer_cache.get(request.question)
+        if cached is not None:
+            answer, sources = cached
+            return AskResponse.model_construct(answer=answer, sources=sources)
         
         # Check if query matches Topic X-Y pattern
-        topic_pattern = re.compile(r'Topic\s+(\d+)-(\d+)', re.IGNORECASE)
-        topic_match = topic_pattern.search(request.question)
-        
-        # Log retrieval configuration
-        if topic_match:
-            topic_label = f"Topic {topic_match.group(1)}-{topic_match.group(2)}"
-            logger.info(f"Retrieval config: k={max_results}, regex matched topic={topic_label}")
-        else:
-            logger.info(f"Retrieval config: k={max_results}, no topic regex match")
+        topic_match = _TOPIC_RE.search(request.question)
         
-        # Search for relevant document chunks with configured k
-        relevant_chunks = await vector_store.search(
-            query=request.question,
-            top_k=max_results if not topic_match else 10  # Get more results for filtering if topic match
-        )
+        # Embed the question once; the embedding is shared by the cache and the search
+        question_embedding = await vector_store.embed_query(request.question)
         
-        # Filter chunks if topic pattern was matched
-        if topic_match:
-            topic_label = f"Topic {topic_match.group(1)}-{topic_match.group(2)}"
-            # Filter to only chunks with matching topic
-            filtered_chunks = []
-            for chunk in relevant_chunks:
-                metadata = chunk.get("metadata", {})
-                if metadata.get("topic") == topic_label:
-                    filtered_chunks.append(chunk)
-            
-            # If we found matching topic chunks, use them; otherwise fall back to top result
-            if filtered_chunks:
-                relevant_chunks = filtered_chunks[:max_results]
-                logger.info(f"Filtered to {len(relevant_chunks)} chunks matching topic={topic_label}")
-            else:
-                # No exact topic match found, use top result anyway
-                relevant_chunks = relevant_chunks[:max_results]
-                logger.info(f"No exact topic match for {topic_label}, using top {max_results} result(s)")
-        else:
-            # No topic pattern, just limit to max_results
-            relevant_chunks = relevant_chunks[:max_results]
-        
-        if not relevant_chunks:
-            logger.warning("No documents found in ChromaDB")
-            return AskResponse(
-                answer="No documents found. Please upload some documents first to ask questions about them.",
-                sources=[]
-            )
+        # Topic references differ by a digit or two, so they would collide in
+        # embedding space; only free-form questions go through the cache
+        use_cache = not topic_match
+        if use_cache:
+            cached = semantic_cache.lookup(question_embedding)
+            if cached is not None:
+                answer, sources = cached
+                return AskResponse.model_construct(answer=answer, sources=sources)
         
-        # Log retrieved chunks for debugging
-        logger.info(f"Retrieved {len(relevant_chunks)} final chunks:")
-        for i, chunk in enumerate(relevant_chunks):
-            metadata = chunk.get("metadata", {})
-            logger.info(f"  Chunk {i+1}: {metadata.get('filename', 'Unknown')} "
-                       f"(chunk {metadata.get('chunk_index', 'N/A')}) "
-                       f"topic={metadata.get('topic', 'None')} "
-                       f"- distance: {chunk.get('distance', 'N/A')}")
-        
-        # Construct context from chunks
-        context_parts = []
-        sources = []
-        
-        for chunk in relevant_chunks:
-            chunk_text = chunk["text"]
-            context_parts.append(chunk_text)
-            metadata = chunk.get("metadata", {})
-            
-            # Convert distance to similarity score (0-100)
-            distance = chunk.get("distance", 1.0)
-            similarity_score = max(0, (1 - distance) * 100)
-            
-            # Create preview (first 150 characters)
-            preview = chunk_text[:150].strip()
-            if len(chunk_text) > 150:
-                preview += "..."
-            
-            # Get topic, convert empty string to None
-            topic_value = metadata.get("topic")
-            if topic_value == "":
-                topic_value = None
-                
-            sources.append(Source(
-                filename=metadata.get("filename", "Unknown"),
-                topic=topic_value,
-                page=metadata.get("page") if metadata.get("page") != 0 else None,
-                line=metadata.get("line") if metadata.get("line") != 0 else None,
-                preview=preview,
-                score=round(similarity_score, 1)
-            ))
+        context, sources = await _retrieve_context(
+            request.question, question_embedding, topic_match, vector_store, llm_service.model, reranker
+        )
         
-        context = "\n\n".join(context_parts)
+        if not sources:
+            return AskResponse(answer=NO_DOCUMENTS_ANSWER, sources=[])
         
         # Generate response using LLM
         answer = await llm_service.generate_response(
@@ -163,30 +255,173 @@ async def ask_question(request: AskRequest):
             context=context
         )
         
-        logger.info(f"Generated answer of length: {len(answer)}")
+        logger.info("Generated answer of length: %d", len(answer))
+        
+        answer_cache.put(request.question, answer, sources)
+        if use_cache:
+            await semantic_cache.add(question_embedding, answer, sources)
         
-        return AskResponse(
+        return AskResponse.model_construct(
             answer=answer,
             sources=sources
         )
         
     except Exception as e:
-        logger.error(f"Error in RAG pipeline: {str(e)}")
+        logger.error("Error in RAG pipeline: %s", e)
         raise HTTPException(
             status_code=500, 
             detail="Error processing your question. Please try again."
         )
 
+def _sse_event(payload: dict) -> str:
+    """Format a payload as a Server-Sent Events data frame"""
+    return f"data: {json.dumps(payload)}\n\n"
+
+@app.post("/ask/stream")
+async def ask_question_stream(
+    request: AskRequest,
+    vector_store: VectorStoreService = Depends(get_vector_store),
+    llm_service: LLMService = Depends(get_llm_service),
+    semantic_cache: SemanticCache = Depends(get_semantic_cache),
+    answer_cache: AnswerCache = Depends(get_answer_cache),
+    reranker: RerankerService = Depends(get_reranker)
+):
+    """
+    Answer questions like /ask, streaming the answer as Server-Sent Events.
+    Emits a `{"sources": [...]}` event first, then `{"token": ...}` events
+    while the answer is generated.
+    """
+    try:
+        logger.info("Processing streamed question: %s", request.question)
+        
+        question_embedding = None
+        use_cache = False
+        cached = answer_cache.get(request.question)
+        
+        if cached is None:
+            topic_match = _TOPIC_RE.search(request.question)
+            question_embedding = await vector_store.embed_query(request.question)
+            
+            use_cache = not topic_match
+            if use_cache:
+                cached = semantic_cache.lookup(question_embedding)
+        
+        context, sources = "", []
+        if cached is None:
+            context, sources = await _retrieve_context(
+                request.question, question_embedding, topic_match, vector_store, llm_service.model, reranker
+            )
+        
+    except Exception as e:
+        logger.error("Error in RAG pipeline: %s", e)
+        raise HTTPException(
+            status_code=500, 
+            detail="Error processing your question. Please try again."
+        )
+    
+    async def token_stream():
+        if cached is not None:
+            answer, cached_sources = cached
+            yield _sse_event({"sources": [source.model_dump() for source in cached_sources]})
+            yield _sse_event({"token": answer})
+            return
+        
+        if not sources:
+            yield _sse_event({"sources": []})
+            yield _sse_event({"token": NO_DOCUMENTS_ANSWER})
+            return
+        
+        # Sources are known before generation starts, so send them right away
+        yield _sse_event({"sources": [source.model_dump() for source in sources]})
+        
+        # Headers are already sent, so errors are reported in-band
+        answer_parts = []
+        try:
+            async for token in llm_service.astream_response(query=request.question, context=context):
+                answer_parts.append(token)
+                yield _sse_event({"token": token})
+        except Exception as e:
+            logger.error("Error streaming answer: %s", e)
+            yield _sse_event({"error": "Error processing your question. Please try again."})
+            return
+        
+        answer = "".join(answer_parts)
+        answer_cache.put(request.question, answer, sources)
+        if use_cache:
+            await semantic_cache.add(question_embedding, answer, sources)
+    
+    return StreamingResponse(token_stream(), media_type="text/event-stream")
+
 class UploadResponse(BaseModel):
     message: str
     document_id: str
     filename: str
     chunks_stored: int
 
-@app.post("/upload-doc", response_model=UploadResponse)
-async def upload_document(file: UploadFile = File(...)):
+class UploadStatusResponse(BaseModel):
+    document_id: str
+    filename: str
+    status: str  # "processing", "completed" or "failed"
+    chunks_stored: int = 0
+    error: Optional[str] = None
+
+# Processing state of uploaded documents, keyed by document ID, oldest first
+upload_status: "OrderedDict[str, UploadStatusResponse]" = OrderedDict()
+
+def _track_upload(status: UploadStatusResponse):
+    """Record a new upload, evicting old statuses past UPLOAD_STATUS_SIZE"""
+    upload_status[status.document_id] = status
+    while len(upload_status) > UPLOAD_STATUS_SIZE:
+        finished = next(
+            (doc_id for doc_id, entry in upload_status.items() if entry.status != "processing"),
+            None
+        )
+        # Only drop an in-flight upload when every tracked one is still processing
+        upload_status.pop(finished if finished is not None else next(iter(upload_status)))
+
+async def _process_document(
+    content: BinaryIO,
+    filename: str,
+    content_type: str,
+    doc_id: str,
+    vector_store: VectorStoreService
+):
+    """Parse, embed and index an uploaded document, recording the outcome in upload_status"""
+    # Fall back to a detached status if this one was evicted while processing
+    status = upload_status.get(doc_id) or UploadStatusResponse(document_id=doc_id, filename=filename, status="processing")
+    try:
+        _, chunk_count = await vector_store.add_document(
+            content=content,
+            filename=filename,
+            content_type=content_type,
+            doc_id=doc_id
+        )
+        
+        logger.info(f"Successfully processed document {filename}: {chunk_count} chunks stored")
+        
+        status.status = "completed"
+        status.chunks_stored = chunk_count
+        
+    except ValueError as e:
+        status.status = "failed"
+        status.error = str(e)
+    except Exception as e:
+        logger.error(f"Error processing document {filename}: {str(e)}")
+        status.status = "failed"
+        status.error = "Internal server error while processing document"
+    finally:
+        content.close()
+
+@app.post("/upload-doc", response_model=UploadResponse, status_code=202)
+async def upload_document(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    vector_store: VectorStoreService = Depends(get_vector_store)
+):
     """
-    Upload a PDF or TXT document for processing
+    Upload a PDF or TXT document for processing.
+    Parsing and indexing happen in the background; poll
+    /upload-doc/{document_id}/status for the result.
     """
     try:
         # Validate file type
@@ -198,35 +433,53 @@ async def upload_document(file: UploadFile = File(...)):
             )
         
         # Read file content
-        content = await file.read()
+        content, size = await read_upload(file)
         
-        if not content:
+        if not size:
+            content.close()
             raise HTTPException(status_code=400, detail="Empty file uploaded")
         
-        # Process document with vector store
-        doc_id, chunk_count = await vector_store.add_document(
-            content=content,
-            filename=file.filename or "unknown",
-            content_type=file.content_type
-        )
+        doc_id = str(uuid.uuid4())
+        filename = file.filename or "unknown"
+        _track_upload(UploadStatusResponse(
+            document_id=doc_id,
+            filename=filename,
+            status="processing"
+        ))
         
-        logger.info(f"Successfully processed document {file.filename}: {chunk_count} chunks stored")
+        # Process document with vector store after the response is sent
+        background_tasks.add_task(
+            _process_document,
+            content,
+            filename,
+            file.content_type,
+            doc_id,
+            vector_store
+        )
         
         return UploadResponse(
-            message="Document uploaded and processed successfully",
+            message="Document accepted for processing",
             document_id=doc_id,
-            filename=file.filename or "unknown",
-            chunks_stored=chunk_count
+            filename=filename,
+            chunks_stored=0
         )
         
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
         raise  # Re-raise HTTP exceptions without modification
     except Exception as e:
         logger.error(f"Error processing document {file.filename}: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error while processing document")
 
+@app.get("/upload-doc/{document_id}/status", response_model=UploadStatusResponse)
+async def upload_document_status(document_id: str):
+    """
+    Report whether an uploaded document has finished processing
+    """
+    status = upload_status.get(document_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown document ID")
+    return status
+
 class TopicItem(BaseModel):
     filename: str
     topic: Optional[str] = None
@@ -244,7 +497,8 @@ class ListTopicsResponse(BaseModel):
 @app.get("/list-topics", response_model=ListTopicsResponse)
 async def list_topics(
     page: int = Query(default=1, ge=1, description="Page number (starts from 1)"),
-    limit: int = Query(default=50, ge=1, le=100, description="Number of items per page (max 100)")
+    limit: int = Query(default=50, ge=1, le=100, description="Number of items per page (max 100)"),
+    vector_store: VectorStoreService = Depends(get_vector_store)
 ):
     """
     List all indexed topics with pagination
@@ -252,38 +506,25 @@ async def list_topics(
     try:
         logger.info(f"Listing topics: page={page}, limit={limit}")
         
-        # Get all chunks from vector store
-        all_chunks = await vector_store.list_all_chunks()
-        
-        # Calculate pagination
-        total = len(all_chunks)
+        # Let Chroma paginate so only the requested page is loaded
         start_idx = (page - 1) * limit
         end_idx = start_idx + limit
-        
-        # Get paginated results
-        paginated_chunks = all_chunks[start_idx:end_idx]
+        total = await vector_store.count_chunks()
+        paginated_chunks = await vector_store.list_chunks_page(start_idx, limit) if start_idx < total else []
         
         # Convert to response format
         topics = []
         for chunk in paginated_chunks:
-            metadata = chunk.get("metadata", {})
+            metadata_get = chunk["metadata"].get
             
-            # Create preview (first 150 characters)
-            chunk_text = chunk.get("text", "")
-            preview = chunk_text[:150].strip()
-            if len(chunk_text) > 150:
-                preview += "..."
+            preview = _make_preview(chunk["text"])
             
-            # Convert empty string topics to None
-            topic_value = metadata.get("topic")
-            if topic_value == "":
-                topic_value = None
-                
+            # Empty topics and zero page/line numbers are stored as placeholders
             topics.append(TopicItem(
-                filename=metadata.get("filename", "Unknown"),
-                topic=topic_value,
-                page=metadata.get("page") if metadata.get("page") != 0 else None,
-                line=metadata.get("line") if metadata.get("line") != 0 else None,
+                filename=metadata_get("filename", "Unknown"),
+                topic=metadata_get("topic") or None,
+                page=metadata_get("page") or None,
+                line=metadata_get("line") or None,
                 preview=preview
             ))
         
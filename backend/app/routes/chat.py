@@ -1,13 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from app.services.vector_store import VectorStoreService
 from app.services.llm import LLMService
+from app.dependencies import get_vector_store, get_llm_service
 
 router = APIRouter()
 
-vector_store = VectorStoreService()
-llm_service = LLMService()
-
 class ChatRequest(BaseModel):
     message: str
     context_limit: int = 3
@@ -17,7 +15,11 @@ class ChatResponse(BaseModel):
     sources: list = []
 
 @router.post("/", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(
+    request: ChatRequest,
+    vector_store: VectorStoreService = Depends(get_vector_store),
+    llm_service: LLMService = Depends(get_llm_service)
+):
     try:
         relevant_docs = await vector_store.search(
             query=request.message,
@@ -1,30 +1,34 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from typing import List
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from app.services.vector_store import VectorStoreService
-from app.services.embeddings import EmbeddingService
+from app.dependencies import get_vector_store
+from app.utils.uploads import read_upload
 
 router = APIRouter()
 
-vector_store = VectorStoreService()
-embedding_service = EmbeddingService()
-
 @router.post("/upload")
-async def upload_document(file: UploadFile = File(...)):
+async def upload_document(
+    file: UploadFile = File(...),
+    vector_store: VectorStoreService = Depends(get_vector_store)
+):
     try:
-        content = await file.read()
-        text = content.decode('utf-8')
-        
-        doc_id = await vector_store.add_document(
-            text=text,
-            metadata={"filename": file.filename}
-        )
+        content, _ = await read_upload(file)
+        try:
+            doc_id, _ = await vector_store.add_document(
+                content,
+                file.filename or "unknown",
+                file.content_type or "text/plain"
+            )
+        finally:
+            content.close()
         
         return {"message": "Document uploaded successfully", "document_id": doc_id}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/")
-async def list_documents():
+async def list_documents(vector_store: VectorStoreService = Depends(get_vector_store)):
     try:
         documents = await vector_store.list_documents()
         return {"documents": documents}
@@ -32,7 +36,10 @@ async def list_documents():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{document_id}")
-async def delete_document(document_id: str):
+async def delete_document(
+    document_id: str,
+    vector_store: VectorStoreService = Depends(get_vector_store)
+):
     try:
         await vector_store.delete_document(document_id)
         return {"message": "Document deleted successfully"}
@@ -0,0 +1,56 @@
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class AnswerCache:
+    """
+    LRU cache of answers keyed by the exact (normalized) question text.
+    Checked before the question is embedded, so repeated questions skip
+    the embedding call as well as retrieval and generation.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size if max_size is not None else int(os.getenv("ANSWER_CACHE_SIZE", "256"))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("ANSWER_CACHE_TTL", "300"))
+        # question -> (stored_at, answer, sources), oldest first
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+
+    @staticmethod
+    def _key(question: str) -> str:
+        # Case and whitespace differences do not change the question
+        return " ".join(question.lower().split())
+
+    def get(self, question: str) -> Optional[Tuple[str, Any]]:
+        """Return the cached (answer, sources) for a question, if still fresh"""
+        key = self._key(question)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        stored_at, answer, sources = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        logger.info("Answer cache hit")
+        return answer, sources
+
+    def put(self, question: str, answer: str, sources: Any):
+        """Store an answer, evicting the least recently used entry when full"""
+        if self.max_size <= 0:
+            return
+
+        key = self._key(question)
+        self._entries[key] = (time.monotonic(), answer, sources)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached answers, e.g. after the document set changes"""
+        self._entries.clear()
@@ -0,0 +1,371 @@
+import io
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Tuple, Optional, BinaryIO
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from PyPDF2 import PdfReader
+try:
+    # Optional: PyMuPDF extracts text far faster than pure-Python PyPDF2
+    import pymupdf
+except ImportError:
+    pymupdf = None
+try:
+    # Optional: PDFium bindings, used when PyMuPDF is not installed
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+
+logger = logging.getLogger(__name__)
+
+# Chunks are measured in tokens of the embedding model, so every chunk has a
+# predictable embedding cost and stays far below the model's input limit
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "250"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))
+
+# A "Topic X-Y" line: page, line, and the rest of the line's text
+_TOPIC_LINE_RE = re.compile(r'Topic\s+(\d+)-(\d+)[:\s]*(.*)', re.IGNORECASE)
+
+# Filename fragments of Encyclopedia or similar structured docs, which get
+# fine-grained parsing
+FINE_GRAINED_FILENAME_PATTERNS = ("encyclopedia", "testing", "topics", "index", "reference")
+FINE_GRAINED_CONTENT_TYPES = frozenset({"application/pdf", "text/plain"})
+
+# PDFs longer than this are extracted in page ranges spread over the parse pool
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "50"))
+
+@lru_cache(maxsize=1)
+def get_text_splitter() -> RecursiveCharacterTextSplitter:
+    """Build the token-counting splitter once per process, on first use"""
+    return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        model_name="text-embedding-3-small",
+        chunk_size=CHUNK_TOKENS,
+        chunk_overlap=CHUNK_OVERLAP_TOKENS,
+        separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""],
+        # Documents may contain text like <|endoftext|>; count it as plain text
+        disallowed_special=()
+    )
+
+class DocumentParser:
+    """
+    Turns uploaded files into text chunks and their metadata
+    Holds no connections, so it can run in worker processes
+    """
+
+    @property
+    def text_splitter(self) -> RecursiveCharacterTextSplitter:
+        return get_text_splitter()
+    
+    def parse(self, content: BinaryIO, filename: str, content_type: str, doc_id: str,
+              page_texts: Optional[List[str]] = None) -> Tuple[List[str], List[Dict]]:
+        """
+        Parse a document and split it into chunks (blocking)
+        PDF pages already extracted by the caller can be passed as page_texts
+        Returns: (chunks, metadatas)
+        """
+        if content_type == "application/pdf" and page_texts is None:
+            page_texts = self._pdf_page_texts(content)
+        
+        # Check if this document needs fine-grained parsing
+        use_fine_grained = self.should_use_fine_grained_parsing(filename, content_type)
+        
+        if use_fine_grained:
+            # Use fine-grained parsing for documents with Topic patterns
+            if content_type == "application/pdf":
+                chunks, metadatas = self._extract_pdf_fine_grained(page_texts, filename, doc_id)
+            else:  # text/plain
+                chunks, metadatas = self._extract_text_fine_grained(content, filename, doc_id)
+        else:
+            # Use standard extraction for other documents
+            if content_type == "application/pdf":
+                text = self._extract_pdf_text(page_texts)
+            else:  # text/plain or other text formats
+                text = self._read_text(content)
+            
+            # Split text into chunks
+            text_chunks = self.text_splitter.split_text(text)
+            
+            if not text_chunks:
+                raise ValueError("No text content could be extracted from the document")
+            
+            chunks = text_chunks
+            metadatas = [{
+                "doc_id": doc_id,
+                "chunk_index": i,
+                "filename": filename,
+                "content_type": content_type,
+                "total_chunks": len(chunks)
+            } for i in range(len(chunks))]
+        
+        if not chunks:
+            raise ValueError("No text content could be extracted from the document")
+        
+        return chunks, metadatas
+    
+    def should_use_fine_grained_parsing(self, filename: str, content_type: str) -> bool:
+        """Determine if fine-grained parsing should be used for this file"""
+        filename_lower = filename.lower()
+        # Enable for PDFs and text files with matching patterns
+        if any(pattern in filename_lower for pattern in FINE_GRAINED_FILENAME_PATTERNS):
+            return content_type in FINE_GRAINED_CONTENT_TYPES
+        return False
+    
+    def _extract_pdf_fine_grained(self, page_texts: List[str], filename: str, doc_id: str) -> Tuple[List[str], List[Dict]]:
+        """
+        Extract PDF pages with fine-grained parsing, detecting Topic X-Y patterns
+        Returns: (chunks, metadatas)
+        """
+        return self.combine_pdf_line_chunks([(page_texts, self._pdf_line_chunks(page_texts))], filename, doc_id)
+    
+    def combine_pdf_line_chunks(self, parts: List[Tuple[List[str], Tuple]], filename: str, doc_id: str) -> Tuple[List[str], List[Dict]]:
+        """
+        Join fine-grained line chunks of consecutive page ranges, in page order
+        parts holds (page_texts, _pdf_line_chunks result) per range
+        Returns: (chunks, metadatas)
+        """
+        chunks = [chunk for _, columns in parts for chunk in columns[0]]
+        
+        # If no fine-grained chunks were created, fall back to paragraph
+        # chunking of the pages already extracted
+        if not chunks:
+            page_texts = [text for texts, _ in parts for text in texts]
+            return self._fallback_pdf_extraction(page_texts, filename, doc_id)
+        
+        pages = [page for _, columns in parts for page in columns[1]]
+        line_nums = [line for _, columns in parts for line in columns[2]]
+        topics = [topic for _, columns in parts for topic in columns[3]]
+        metadatas = self._line_metadatas(doc_id, filename, "application/pdf", pages, line_nums, topics)
+        
+        logger.info(f"Fine-grained parsing extracted {len(chunks)} chunks from {filename}")
+        return chunks, metadatas
+    
+    def _pdf_line_chunks(self, page_texts: List[str], first_page: int = 1) -> Tuple[List[str], List[int], List[int], List[str]]:
+        """
+        Fine-grained line chunks of consecutive PDF pages, starting at first_page
+        Per-chunk fields are kept column by column; metadata dicts are built
+        once all chunks are known
+        Returns: (chunks, pages, lines, topics)
+        """
+        chunks = []
+        pages = []
+        line_nums = []
+        topics = []
+        
+        for page_num, text in enumerate(page_texts, start=first_page):
+            if not text:
+                continue
+            
+            # Split by lines for fine-grained processing
+            lines = text.split('\n')
+            
+            for line_num, line in enumerate(lines, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                
+                # Check if this line contains a Topic marker
+                topic_match = _TOPIC_LINE_RE.search(line)
+                
+                if topic_match:
+                    # This is a topic line - its full line becomes its own chunk
+                    topic_label = f"Topic {topic_match.group(1)}-{topic_match.group(2)}"
+                elif len(line) > 50:  # Only create chunks for substantial lines
+                    # Regular line - check if it's meaningful content
+                    topic_label = ""  # Use empty string instead of None
+                else:
+                    continue
+                
+                chunks.append(line)
+                pages.append(page_num)
+                line_nums.append(line_num)
+                topics.append(topic_label)
+        
+        return chunks, pages, line_nums, topics
+    
+    def _extract_text_fine_grained(self, content: BinaryIO, filename: str, doc_id: str) -> Tuple[List[str], List[Dict]]:
+        """
+        Extract text file with fine-grained parsing, detecting Topic X-Y patterns
+        Returns: (chunks, metadatas)
+        """
+        text = self._read_text(content)
+        
+        chunks = []
+        pages = []
+        line_nums = []
+        topics = []
+        
+        # Split by lines for fine-grained processing
+        lines = text.split('\n')
+        
+        for line_num, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            
+            # Check if this line contains a Topic marker
+            topic_match = _TOPIC_LINE_RE.search(line)
+            
+            if topic_match:
+                # This is a topic line - located by its own page and line numbers
+                topic_page = topic_match.group(1)
+                topic_line = topic_match.group(2)
+                chunks.append(line)
+                pages.append(int(topic_page))
+                line_nums.append(int(topic_line))
+                topics.append(f"Topic {topic_page}-{topic_line}")
+            elif len(line) > 30:  # Only create chunks for substantial lines
+                # Regular line
+                chunks.append(line)
+                pages.append(0)  # Use 0 instead of None for ChromaDB compatibility
+                line_nums.append(line_num)
+                topics.append("")  # Use empty string instead of None
+        
+        metadatas = self._line_metadatas(doc_id, filename, "text/plain", pages, line_nums, topics)
+        
+        logger.info(f"Fine-grained parsing extracted {len(chunks)} chunks from {filename}")
+        return chunks, metadatas
+    
+    def _line_metadatas(self, doc_id: str, filename: str, content_type: str,
+                        pages: List[int], lines: List[int], topics: List[str]) -> List[Dict]:
+        """Build the metadata dicts of line chunks from their per-chunk columns"""
+        total_chunks = len(topics)
+        return [{
+            "doc_id": doc_id,
+            "chunk_index": i,
+            "filename": filename,
+            "content_type": content_type,
+            "page": page,
+            "line": line,
+            "topic": topic,
+            "is_topic": bool(topic),
+            "total_chunks": total_chunks
+        } for i, (page, line, topic) in enumerate(zip(pages, lines, topics))]
+    
+    def _fallback_pdf_extraction(self, page_texts: List[str], filename: str, doc_id: str) -> Tuple[List[str], List[Dict]]:
+        """Fallback to standard paragraph-based extraction"""
+        text = "\n\n".join(text for text in page_texts if text)
+        chunks = self.text_splitter.split_text(text)
+        
+        metadatas = [{
+            "doc_id": doc_id,
+            "chunk_index": i,
+            "filename": filename,
+            "content_type": "application/pdf",
+            "total_chunks": len(chunks)
+        } for i in range(len(chunks))]
+        
+        return chunks, metadatas
+    
+    def _read_text(self, content: BinaryIO) -> str:
+        """Decode a text file object as UTF-8"""
+        content.seek(0)
+        return content.read().decode('utf-8', errors='ignore')
+    
+    def _pdf_page_texts(self, content: BinaryIO, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """
+        Extract the text of pages [start, stop) of a PDF file object, using
+        PyMuPDF or PDFium when installed and PyPDF2 otherwise
+        """
+        content.seek(0)
+        if pymupdf is not None or pypdfium2 is not None:
+            try:
+                return _native_page_texts(content.read(), start, stop)
+            except Exception as e:
+                # PyPDF2 is more lenient with some malformed files
+                logger.warning(f"Native PDF extraction failed, falling back to PyPDF2: {e}")
+                content.seek(0)
+        
+        reader = PdfReader(content)
+        return [page.extract_text() for page in reader.pages[start:stop]]
+    
+    def _extract_pdf_text(self, page_texts: List[str]) -> str:
+        """Join the non-empty page texts of a PDF"""
+        text_parts = [text for text in page_texts if text]
+        return "\n\n".join(text_parts)
+
+@lru_cache(maxsize=1)
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Worker processes for document parsing, created on first use
+    PARSE_WORKERS=0 disables the pool and parses in a thread instead
+    """
+    workers = int(os.getenv("PARSE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+    if workers <= 0:
+        return None
+    # Spawn rather than fork: the server process runs threads (Chroma, the
+    # event loop's executor) whose locks must not be copied into children
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+_worker_parser: Optional[DocumentParser] = None
+
+def _get_worker_parser() -> DocumentParser:
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = DocumentParser()
+    return _worker_parser
+
+def parse_document(data: bytes, filename: str, content_type: str, doc_id: str,
+                   page_texts: Optional[List[str]] = None) -> Tuple[List[str], List[Dict]]:
+    """
+    Process pool entry point: parse raw file bytes in a worker
+    Returns: (chunks, metadatas)
+    """
+    return _get_worker_parser().parse(io.BytesIO(data), filename, content_type, doc_id, page_texts)
+
+def extract_pdf_pages(data: bytes, start: int, stop: int) -> List[str]:
+    """Process pool entry point: text of pages [start, stop) of a PDF"""
+    return _get_worker_parser()._pdf_page_texts(io.BytesIO(data), start, stop)
+
+def _native_page_texts(data: bytes, start: int, stop: Optional[int]) -> List[str]:
+    """Page texts through a C-backed PDF library; requires pymupdf or pypdfium2"""
+    if pymupdf is not None:
+        with pymupdf.open(stream=data, filetype="pdf") as pdf:
+            stop = pdf.page_count if stop is None else min(stop, pdf.page_count)
+            return [pdf[i].get_text("text") for i in range(start, stop)]
+    
+    pdf = pypdfium2.PdfDocument(data)
+    try:
+        stop = len(pdf) if stop is None else min(stop, len(pdf))
+        texts = []
+        for i in range(start, stop):
+            textpage = pdf[i].get_textpage()
+            # PDFium ends lines with \r\n; the line parsers split on \n
+            texts.append(textpage.get_text_range().replace("\r\n", "\n"))
+            textpage.close()
+        return texts
+    finally:
+        pdf.close()
+
+def extract_pdf_line_chunks(data: bytes, start: int, stop: int) -> Tuple[List[str], Tuple]:
+    """
+    Process pool entry point: fine-grained line chunks of pages [start, stop)
+    The page texts are returned too, for the paragraph fallback
+    Returns: (page_texts, (chunks, pages, lines, topics))
+    """
+    parser = _get_worker_parser()
+    page_texts = parser._pdf_page_texts(io.BytesIO(data), start, stop)
+    return page_texts, parser._pdf_line_chunks(page_texts, first_page=start + 1)
+
+def _native_page_count(data: bytes) -> int:
+    """Page count through a C-backed PDF library; requires pymupdf or pypdfium2"""
+    if pymupdf is not None:
+        with pymupdf.open(stream=data, filetype="pdf") as pdf:
+            return pdf.page_count
+    pdf = pypdfium2.PdfDocument(data)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+def pdf_page_count(data: bytes) -> int:
+    """Number of pages in a PDF, without extracting any text"""
+    if pymupdf is not None or pypdfium2 is not None:
+        try:
+            return _native_page_count(data)
+        except Exception as e:
+            # Same fallback as page extraction, which PyPDF2 may still manage
+            logger.warning(f"Native PDF page count failed, falling back to PyPDF2: {e}")
+    return len(PdfReader(io.BytesIO(data)).pages)
\ No newline at end of file
@@ -1,18 +1,103 @@
-from openai import OpenAI
-from typing import List
+from typing import List, Optional, Tuple
+import asyncio
+import numpy as np
 import os
+from openai import NOT_GIVEN
+from app.services.openai_client import get_openai_client
 
 class EmbeddingService:
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = get_openai_client()
         self.model = "text-embedding-3-small"
+        # Optional shorter vectors (e.g. 512 instead of 1536); the model is
+        # trained so leading dimensions carry most of the meaning
+        self.dimensions = int(os.getenv("EMBEDDING_DIMENSIONS", "0")) or None
+        # Texts per embeddings request. Smaller batches finish sooner and run
+        # side by side; OpenAI accepts at most 2048 inputs per request
+        self.batch_size = min(int(os.getenv("EMBEDDING_BATCH_SIZE", "96")), 2048)
+        # Cap on document embedding requests in flight at once; question
+        # embeddings bypass it so they never queue behind an ingestion
+        self.max_concurrency = int(os.getenv("EMBEDDING_CONCURRENCY", "8"))
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Queries arriving within this window share one embeddings request
+        self.query_batch_window = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5")) / 1000
+        self._pending_queries: List[Tuple[str, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
     
-    async def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+    async def get_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed document texts in order, within the ingestion concurrency cap
+        Returns: float32 array of shape (len(texts), dimensions)
+        """
         try:
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=texts
-            )
-            return [embedding.embedding for embedding in response.data]
+            if len(texts) <= self.batch_size:
+                return await self._embed_bulk(texts)
+            
+            # Group similar-length texts so no batch waits on one long outlier,
+            # embed the batches concurrently, then restore the input order
+            order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+            batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+            results = await asyncio.gather(*(
+                self._embed_bulk([texts[i] for i in batch]) for batch in batches
+            ))
+            
+            embeddings = np.empty((len(texts), results[0].shape[1]), dtype=np.float32)
+            for batch, batch_embeddings in zip(batches, results):
+                embeddings[batch] = batch_embeddings
+            return embeddings
         except Exception as e:
-            raise Exception(f"Error generating embeddings: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error generating embeddings: {str(e)}")
+    
+    async def embed_query(self, text: str) -> np.ndarray:
+        """
+        Embed a single query; concurrent queries are collected for a few
+        milliseconds and sent together in one request
+        """
+        if self.query_batch_window <= 0:
+            return (await self._embed_queries([text]))[0]
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending_queries.append((text, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_queries())
+        return await future
+    
+    async def _flush_queries(self):
+        await asyncio.sleep(self.query_batch_window)
+        batch, self._pending_queries = self._pending_queries, []
+        self._flush_task = None
+        
+        try:
+            embeddings = await self._embed_queries([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        # Waiters that were cancelled meanwhile no longer need a result
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+    
+    async def _embed_queries(self, texts: List[str]) -> np.ndarray:
+        try:
+            return await self._embed_batch(texts)
+        except Exception as e:
+            raise Exception(f"Error generating embeddings: {str(e)}")
+    
+    async def _embed_bulk(self, texts: List[str]) -> np.ndarray:
+        async with self._semaphore:
+            return await self._embed_batch(texts)
+    
+    async def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        response = await self.client.embeddings.create(
+            model=self.model,
+            input=texts,
+            dimensions=self.dimensions or NOT_GIVEN
+        )
+        # Scale to unit length so inner-product search equals cosine similarity;
+        # OpenAI vectors are already close to unit length
+        vectors = np.array([embedding.embedding for embedding in response.data], dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        return vectors
\ No newline at end of file
@@ -1,33 +1,55 @@
-from openai import OpenAI
-import os
+from typing import AsyncIterator, Dict, List
+from app.services.openai_client import get_openai_client
 
-class LLMService:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.model = "gpt-4o-mini"
-    
-    async def generate_response(self, query: str, context: str) -> str:
-        try:
-            system_prompt = """You are a helpful assistant that answers questions based on the provided context. 
+SYSTEM_PROMPT = """You are a helpful assistant that answers questions based on the provided context. 
             If the context doesn't contain relevant information, say so."""
-            
-            user_prompt = f"""Context:
+
+USER_PROMPT_TEMPLATE = """Context:
 {context}
 
 Question: {query}
 
 Please provide a helpful answer based on the context above."""
-            
-            response = self.client.chat.completions.create(
+
+class LLMService:
+    def __init__(self):
+        self.client = get_openai_client()
+        self.model = "gpt-4o-mini"
+    
+    def _build_messages(self, query: str, context: str) -> List[Dict[str, str]]:
+        # The system message is byte-identical across requests so it forms a
+        # stable prompt prefix the provider can cache; per-request text goes last
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": USER_PROMPT_TEMPLATE.format(context=context, query=query)}
+        ]
+    
+    async def generate_response(self, query: str, context: str) -> str:
+        try:
+            response = await self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=self._build_messages(query, context),
                 temperature=0.7,
                 max_tokens=500
             )
             
             return response.choices[0].message.content
+        except Exception as e:
+            raise Exception(f"Error generating response: {str(e)}")
+    
+    async def astream_response(self, query: str, context: str) -> AsyncIterator[str]:
+        """Yield the answer token by token as the model produces it"""
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(query, context),
+                temperature=0.7,
+                max_tokens=500,
+                stream=True
+            )
+            
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
         except Exception as e:
             raise Exception(f"Error generating response: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,18 @@
+from functools import lru_cache
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+import httpx
+import os
+
+@lru_cache(maxsize=1)
+def get_openai_client() -> AsyncOpenAI:
+    """
+    One OpenAI client per process, shared by the embedding and chat services
+    Requests multiplex over long-lived HTTP/2 connections instead of paying
+    a TCP and TLS handshake each time
+    """
+    http_client = DefaultAsyncHttpxClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+        timeout=httpx.Timeout(30.0, connect=5.0)
+    )
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client)
\ No newline at end of file
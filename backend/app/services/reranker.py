@@ -0,0 +1,61 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+class RerankerService:
+    """
+    Optional cross-encoder reranking of retrieved chunks.
+    Disabled unless RERANKER_MODEL names a cross-encoder (for example
+    cross-encoder/ms-marco-MiniLM-L-6-v2); enabling it requires the
+    sentence-transformers package.
+    """
+
+    def __init__(self):
+        self.model_name = os.getenv("RERANKER_MODEL", "")
+        # How many vector search results are rescored
+        self.candidates = int(os.getenv("RERANK_CANDIDATES", "20"))
+        # Chunks scoring at least this high make weaker candidates unnecessary
+        self.confidence = float(os.getenv("RERANK_CONFIDENCE", "0.8"))
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.model_name)
+
+    def _get_model(self):
+        with self._model_lock:
+            if self._model is None:
+                from sentence_transformers import CrossEncoder
+                logger.info("Loading reranker model %s", self.model_name)
+                self._model = CrossEncoder(self.model_name)
+            return self._model
+
+    def _score(self, query: str, texts: List[str]) -> List[float]:
+        model = self._get_model()
+        # One batched forward pass over every (query, chunk) pair
+        scores = model.predict([(query, text) for text in texts], batch_size=len(texts))
+        return [float(score) for score in scores]
+
+    async def rerank(self, query: str, chunks: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """
+        Order chunks by cross-encoder relevance and keep at most top_k
+        If any chunk clears the confidence threshold, only confident chunks are kept
+        """
+        if not chunks:
+            return chunks
+
+        # Model inference is CPU-bound; keep it off the event loop
+        scores = await asyncio.to_thread(self._score, query, [chunk["text"] for chunk in chunks])
+        ranked = sorted(zip(scores, chunks), key=lambda pair: pair[0], reverse=True)
+
+        confident = [chunk for score, chunk in ranked if score >= self.confidence]
+        selected = confident if confident else [chunk for _, chunk in ranked]
+
+        logger.info("Reranked %d candidates, top score %.3f, %d confident",
+                    len(chunks), ranked[0][0], len(confident))
+        return selected[:top_k]
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import os
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class SemanticCache:
+    """
+    In-memory cache of previous answers keyed by question embedding.
+    A lookup is a hit when the cosine similarity between the new question
+    and a cached one reaches the configured threshold.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, max_size: Optional[int] = None):
+        self.threshold = threshold if threshold is not None else float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+        self.max_size = max_size if max_size is not None else int(os.getenv("SEMANTIC_CACHE_SIZE", "512"))
+        # Ring buffer of L2-normalized embeddings, allocated on first insert
+        self.emb_matrix: Optional[np.ndarray] = None
+        self.entries: List[Optional[Tuple[str, Any]]] = [None] * self.max_size
+        self._size = 0
+        self._next = 0
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def lookup(self, embedding: List[float]) -> Optional[Tuple[str, Any]]:
+        """
+        Return the cached (answer, sources) for the most similar question,
+        or None if nothing is similar enough
+        """
+        if self._size == 0 or self.max_size <= 0:
+            return None
+
+        query = self._normalize(embedding)
+        scores = self.emb_matrix[:self._size] @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+
+        logger.info("Semantic cache hit (similarity=%.3f)", scores[best])
+        return self.entries[best]
+
+    async def add(self, embedding: List[float], answer: str, sources: Any):
+        """Store an answer, evicting the oldest entry once the cache is full"""
+        if self.max_size <= 0:
+            return
+
+        vector = self._normalize(embedding)
+        async with self._lock:
+            if self.emb_matrix is None or self.emb_matrix.shape[1] != vector.shape[0]:
+                self.emb_matrix = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+                self.entries = [None] * self.max_size
+                self._size = 0
+                self._next = 0
+
+            self.emb_matrix[self._next] = vector
+            self.entries[self._next] = (answer, sources)
+            self._next = (self._next + 1) % self.max_size
+            self._size = min(self._size + 1, self.max_size)
+
+    async def clear(self):
+        """Drop all cached answers, e.g. after the document set changes"""
+        async with self._lock:
+            self.entries = [None] * self.max_size
+            self._size = 0
+            self._next = 0
@@ -1,82 +1,84 @@
+import asyncio
+import hashlib
+import os
 import chromadb
+import numpy as np
+from chromadb.api import ClientAPI
 from chromadb.config import Settings
 import uuid
-from typing import List, Dict, Any, Tuple
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from PyPDF2 import PdfReader
+from typing import List, Dict, Any, Tuple, Optional, BinaryIO, Callable, Awaitable
 import logging
-import re
+from collections import OrderedDict
 from app.services.embeddings import EmbeddingService
+from app.services.document_parser import (
+    PDF_PAGES_PER_TASK, DocumentParser, extract_pdf_line_chunks, extract_pdf_pages, get_parse_pool,
+    parse_document, pdf_page_count
+)
 
 logger = logging.getLogger(__name__)
 
 class VectorStoreService:
-    def __init__(self):
-        self.client = chromadb.PersistentClient(
+    def __init__(self, client: Optional[ClientAPI] = None, on_change: Optional[Callable[[], Awaitable[None]]] = None):
+        # Tests pass an in-memory chromadb.EphemeralClient instead
+        self.client = client or chromadb.PersistentClient(
             path="./data",
             settings=Settings(anonymized_telemetry=False)
         )
-        self.collection = self.client.get_or_create_collection(
-            name="documents",
-            metadata={"hnsw:space": "cosine"}
-        )
+        # Embeddings are stored unit-length, so inner product equals cosine
+        # similarity without a per-query normalization. HNSW settings only
+        # apply when the collection is first created
+        index_metadata = {
+            "hnsw:space": "ip",
+            "hnsw:M": int(os.getenv("HNSW_M", "32")),
+            "hnsw:construction_ef": int(os.getenv("HNSW_CONSTRUCTION_EF", "256")),
+            "hnsw:search_ef": int(os.getenv("HNSW_SEARCH_EF", "128"))
+        }
+        if self.client.get_settings().is_persistent:
+            # Inserts are buffered and added to the graph in multi-threaded
+            # batches; the index file is rewritten every sync_threshold inserts
+            index_metadata["hnsw:batch_size"] = int(os.getenv("HNSW_BATCH_SIZE", "500"))
+            index_metadata["hnsw:sync_threshold"] = int(os.getenv("HNSW_SYNC_THRESHOLD", "5000"))
+        self.collection = self.client.get_or_create_collection(name="documents", metadata=index_metadata)
+        # One vector per unique chunk text, keyed by content hash, so reuse
+        # lookups stay the same size however often a document is re-uploaded
+        self.embedding_cache = self.client.get_or_create_collection(name="chunk_embeddings", metadata=index_metadata)
         self.embedding_service = EmbeddingService()
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len,
-            separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""]
-        )
+        self.parser = DocumentParser()
+        # Query digest -> embedding, least recently used first
+        self.query_cache_size = int(os.getenv("EMBEDDING_CACHE_SIZE", "1024"))
+        self._query_embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # Awaited after every document add or delete, e.g. to drop cached answers
+        self.on_change = on_change
     
-    async def add_document(self, content: bytes, filename: str, content_type: str) -> Tuple[str, int]:
+    async def add_document(self, content: BinaryIO, filename: str, content_type: str, doc_id: Optional[str] = None) -> Tuple[str, int]:
         """
         Add a document to the vector store with fine-grained parsing
+        content is a binary file object; parsers read it from the start
+        A document ID is generated unless the caller already assigned one
         Returns: (document_id, number_of_chunks)
         """
-        doc_id = str(uuid.uuid4())
-        
-        # Check if this document needs fine-grained parsing
-        use_fine_grained = self._should_use_fine_grained_parsing(filename, content_type)
-        
-        if use_fine_grained:
-            # Use fine-grained parsing for documents with Topic patterns
-            if content_type == "application/pdf":
-                chunks, metadatas = self._extract_pdf_fine_grained(content, filename, doc_id)
-            else:  # text/plain
-                chunks, metadatas = self._extract_text_fine_grained(content, filename, doc_id)
+        doc_id = doc_id or str(uuid.uuid4())
+        
+        # Parsing and splitting are CPU-bound; run them in a worker process so
+        # they neither block the event loop nor hold its GIL
+        pool = get_parse_pool()
+        if pool is None:
+            chunks, metadatas = await asyncio.to_thread(
+                self.parser.parse, content, filename, content_type, doc_id
+            )
+            embeddings = await self._tag_and_embed(chunks, metadatas)
         else:
-            # Use standard extraction for other documents
-            if content_type == "application/pdf":
-                text = self._extract_pdf_text(content)
-            else:  # text/plain or other text formats
-                text = content.decode('utf-8', errors='ignore')
-            
-            # Split text into chunks
-            text_chunks = self.text_splitter.split_text(text)
-            
-            if not text_chunks:
-                raise ValueError("No text content could be extracted from the document")
-            
-            chunks = text_chunks
-            metadatas = [{
-                "doc_id": doc_id,
-                "chunk_index": i,
-                "filename": filename,
-                "content_type": content_type,
-                "total_chunks": len(chunks)
-            } for i in range(len(chunks))]
-        
-        if not chunks:
-            raise ValueError("No text content could be extracted from the document")
-        
-        # Generate embeddings
-        embeddings = await self.embedding_service.get_embeddings(chunks)
+            content.seek(0)
+            chunks, metadatas, embeddings = await self._parse_and_embed_in_pool(
+                pool, content.read(), filename, content_type, doc_id
+            )
         
         # Prepare IDs for ChromaDB
         ids = [f"{doc_id}_{i}" for i in range(len(chunks))]
         
-        # Store in ChromaDB
-        self.collection.add(
+        # Store in ChromaDB off the event loop; indexing a large document blocks
+        await asyncio.to_thread(
+            self.collection.add,
             documents=chunks,
             embeddings=embeddings,
             ids=ids,
@@ -84,219 +86,214 @@ class VectorStoreService:
         )
         
         logger.info(f"Stored {len(chunks)} chunks for document {filename} (ID: {doc_id})")
+        await self._notify_change()
         
         return doc_id, len(chunks)
-    
-    def _should_use_fine_grained_parsing(self, filename: str, content_type: str) -> bool:
-        """Determine if fine-grained parsing should be used for this file"""
-        # Use fine-grained parsing for Encyclopedia or similar structured docs
-        fine_grained_patterns = [
-            "encyclopedia", "testing", "topics", "index", "reference"
-        ]
-        filename_lower = filename.lower()
-        # Enable for PDFs and text files with matching patterns
-        if any(pattern in filename_lower for pattern in fine_grained_patterns):
-            return content_type in ["application/pdf", "text/plain"]
-        return False
-    
-    def _extract_pdf_fine_grained(self, content: bytes, filename: str, doc_id: str) -> Tuple[List[str], List[Dict]]:
+
+    async def _parse_and_embed_in_pool(self, pool, data: bytes, filename: str, content_type: str,
+                                       doc_id: str) -> Tuple[List[str], List[Dict], np.ndarray]:
         """
-        Extract PDF with fine-grained parsing, detecting Topic X-Y patterns
-        Returns: (chunks, metadatas)
+        Parse a document in the worker pool and embed its chunks
+        Long PDFs have their pages extracted in ranges across all workers
+        Returns: (chunks, metadatas, embeddings)
         """
-        import io
-        pdf_file = io.BytesIO(content)
-        reader = PdfReader(pdf_file)
-        
-        chunks = []
-        metadatas = []
-        chunk_index = 0
-        
-        # Regex pattern to detect "Topic X-Y" format
-        topic_pattern = re.compile(r'Topic\s+(\d+)-(\d+)[:\s]*(.*)', re.IGNORECASE)
-        
-        for page_num, page in enumerate(reader.pages, start=1):
-            text = page.extract_text()
-            if not text:
-                continue
-            
-            # Split by lines for fine-grained processing
-            lines = text.split('\n')
-            
-            for line_num, line in enumerate(lines, start=1):
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Check if this line contains a Topic marker
-                topic_match = topic_pattern.search(line)
+        loop = asyncio.get_running_loop()
+        if content_type == "application/pdf":
+            page_count = await asyncio.to_thread(pdf_page_count, data)
+            if page_count > PDF_PAGES_PER_TASK:
+                ranges = [(start, min(start + PDF_PAGES_PER_TASK, page_count))
+                          for start in range(0, page_count, PDF_PAGES_PER_TASK)]
+                if self.parser.should_use_fine_grained_parsing(filename, content_type):
+                    return await self._parse_and_embed_pdf_lines(pool, data, ranges, filename, doc_id)
                 
-                if topic_match:
-                    # This is a topic line - create its own chunk
-                    topic_page = topic_match.group(1)
-                    topic_line = topic_match.group(2)
-                    topic_text = topic_match.group(3)
-                    topic_label = f"Topic {topic_page}-{topic_line}"
-                    
-                    # Create chunk with the full line
-                    chunks.append(line)
-                    metadatas.append({
-                        "doc_id": doc_id,
-                        "chunk_index": chunk_index,
-                        "filename": filename,
-                        "content_type": "application/pdf",
-                        "page": page_num,
-                        "line": line_num,
-                        "topic": topic_label,
-                        "is_topic": True
-                    })
-                    chunk_index += 1
-                elif len(line) > 50:  # Only create chunks for substantial lines
-                    # Regular line - check if it's meaningful content
-                    chunks.append(line)
-                    metadatas.append({
-                        "doc_id": doc_id,
-                        "chunk_index": chunk_index,
-                        "filename": filename,
-                        "content_type": "application/pdf",
-                        "page": page_num,
-                        "line": line_num,
-                        "topic": "",  # Use empty string instead of None
-                        "is_topic": False
-                    })
-                    chunk_index += 1
-        
-        # If no fine-grained chunks were created, fall back to paragraph chunking
-        if not chunks:
-            return self._fallback_pdf_extraction(content, filename, doc_id)
-        
-        # Update total_chunks in metadata
-        for metadata in metadatas:
-            metadata["total_chunks"] = len(chunks)
-        
-        logger.info(f"Fine-grained parsing extracted {len(chunks)} chunks from {filename}")
-        return chunks, metadatas
+                parts = await asyncio.gather(*(
+                    loop.run_in_executor(pool, extract_pdf_pages, data, start, stop)
+                    for start, stop in ranges
+                ))
+                page_texts = [text for part in parts for text in part]
+                logger.info("Extracted %d PDF pages in %d parallel ranges", page_count, len(ranges))
+                chunks, metadatas = await loop.run_in_executor(
+                    pool, parse_document, b"", filename, content_type, doc_id, page_texts
+                )
+                return chunks, metadatas, await self._tag_and_embed(chunks, metadatas)
+        
+        chunks, metadatas = await loop.run_in_executor(pool, parse_document, data, filename, content_type, doc_id)
+        return chunks, metadatas, await self._tag_and_embed(chunks, metadatas)
     
-    def _extract_text_fine_grained(self, content: bytes, filename: str, doc_id: str) -> Tuple[List[str], List[Dict]]:
+    async def _parse_and_embed_pdf_lines(self, pool, data: bytes, ranges: List[Tuple[int, int]], filename: str,
+                                         doc_id: str) -> Tuple[List[str], List[Dict], np.ndarray]:
         """
-        Extract text file with fine-grained parsing, detecting Topic X-Y patterns
-        Returns: (chunks, metadatas)
+        Fine-grained parsing of a long PDF, one page range per worker task
+        Each range's line chunks are embedded as soon as that range is parsed,
+        so embedding requests overlap with parsing of the remaining pages
+        Returns: (chunks, metadatas, embeddings)
         """
-        text = content.decode('utf-8', errors='ignore')
+        loop = asyncio.get_running_loop()
+        # Shared by all ranges so text repeated across pages is embedded once
+        vectors: Dict[str, asyncio.Future] = {}
         
-        chunks = []
-        metadatas = []
-        chunk_index = 0
+        async def parse_and_embed(start: int, stop: int):
+            page_texts, columns = await loop.run_in_executor(pool, extract_pdf_line_chunks, data, start, stop)
+            hashes = [self._content_hash(chunk) for chunk in columns[0]]
+            embeddings = await self._embed_chunks(columns[0], hashes, vectors) if hashes else None
+            return page_texts, columns, hashes, embeddings
         
-        # Regex pattern to detect "Topic X-Y" format
-        topic_pattern = re.compile(r'Topic\s+(\d+)-(\d+)[:\s]*(.*)', re.IGNORECASE)
+        parts = await asyncio.gather(*(parse_and_embed(start, stop) for start, stop in ranges))
+        logger.info("Parsed %d PDF page ranges in parallel", len(ranges))
         
-        # Split by lines for fine-grained processing
-        lines = text.split('\n')
-        
-        for line_num, line in enumerate(lines, start=1):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Check if this line contains a Topic marker
-            topic_match = topic_pattern.search(line)
-            
-            if topic_match:
-                # This is a topic line - create its own chunk
-                topic_page = topic_match.group(1)
-                topic_line = topic_match.group(2)
-                topic_text = topic_match.group(3)
-                topic_label = f"Topic {topic_page}-{topic_line}"
-                
-                # Create chunk with the full line
-                chunks.append(line)
-                metadatas.append({
-                    "doc_id": doc_id,
-                    "chunk_index": chunk_index,
-                    "filename": filename,
-                    "content_type": "text/plain",
-                    "page": int(topic_page),
-                    "line": int(topic_line),
-                    "topic": topic_label,
-                    "is_topic": True
-                })
-                chunk_index += 1
-            elif len(line) > 30:  # Only create chunks for substantial lines
-                # Regular line
-                chunks.append(line)
-                metadatas.append({
-                    "doc_id": doc_id,
-                    "chunk_index": chunk_index,
-                    "filename": filename,
-                    "content_type": "text/plain",
-                    "page": 0,  # Use 0 instead of None for ChromaDB compatibility
-                    "line": line_num,
-                    "topic": "",  # Use empty string instead of None
-                    "is_topic": False
-                })
-                chunk_index += 1
+        chunks, metadatas = self.parser.combine_pdf_line_chunks(
+            [(page_texts, columns) for page_texts, columns, _, _ in parts], filename, doc_id
+        )
+        if not chunks:
+            raise ValueError("No text content could be extracted from the document")
         
-        # Update total_chunks in metadata
-        for metadata in metadatas:
-            metadata["total_chunks"] = len(chunks)
+        hashes = [content_hash for _, _, part_hashes, _ in parts for content_hash in part_hashes]
+        if not hashes:
+            # No line chunks anywhere; the parser fell back to paragraph chunks
+            return chunks, metadatas, await self._tag_and_embed(chunks, metadatas)
         
-        logger.info(f"Fine-grained parsing extracted {len(chunks)} chunks from {filename}")
-        return chunks, metadatas
+        for metadata, content_hash in zip(metadatas, hashes):
+            metadata["content_hash"] = content_hash
+        embeddings = np.concatenate([part_embeddings for *_, part_embeddings in parts if part_embeddings is not None])
+        return chunks, metadatas, embeddings
     
-    def _fallback_pdf_extraction(self, content: bytes, filename: str, doc_id: str) -> Tuple[List[str], List[Dict]]:
-        """Fallback to standard paragraph-based extraction"""
-        text = self._extract_pdf_text(content)
-        chunks = self.text_splitter.split_text(text)
-        
-        metadatas = [{
-            "doc_id": doc_id,
-            "chunk_index": i,
-            "filename": filename,
-            "content_type": "application/pdf",
-            "total_chunks": len(chunks)
-        } for i in range(len(chunks))]
-        
-        return chunks, metadatas
+    async def _tag_and_embed(self, chunks: List[str], metadatas: List[Dict]) -> np.ndarray:
+        """Embed chunks after tagging their metadata with a content hash"""
+        # The hash is also the key of the chunk's vector in embedding_cache
+        hashes = [self._content_hash(chunk) for chunk in chunks]
+        for metadata, content_hash in zip(metadatas, hashes):
+            metadata["content_hash"] = content_hash
+        return await self._embed_chunks(chunks, hashes)
     
-    def _extract_pdf_text(self, content: bytes) -> str:
-        """Extract text from PDF bytes"""
-        import io
-        pdf_file = io.BytesIO(content)
-        reader = PdfReader(pdf_file)
-        
-        text_parts = []
-        for page_num, page in enumerate(reader.pages):
-            text = page.extract_text()
-            if text:
-                text_parts.append(text)
-        
-        return "\n\n".join(text_parts)
+    def _content_hash(self, text: str) -> str:
+        # Vectors are only interchangeable for the same model and size
+        service = self.embedding_service
+        key = f"{service.model}:{service.dimensions or ''}:{text}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
     
-    async def search(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
-        query_embedding = await self.embedding_service.get_embeddings([query])
-        
-        results = self.collection.query(
-            query_embeddings=query_embedding,
-            n_results=top_k
+    async def _embed_chunks(self, chunks: List[str], hashes: List[str],
+                            vectors: Optional[Dict[str, asyncio.Future]] = None) -> np.ndarray:
+        """
+        Embed document chunks, reusing the stored vector of any chunk whose
+        exact text was indexed before
+        vectors maps content hashes to their embedding futures; calls for the
+        same upload share it so a text another call already claimed is
+        awaited instead of looked up and embedded again
+        Returns: float32 array with one row per chunk
+        """
+        if not chunks:
+            # Chroma rejects an empty ids list
+            return np.empty((0, self.embedding_service.dimensions or 0), dtype=np.float32)
+        
+        vectors = {} if vectors is None else vectors
+        # Repeated text within the document (e.g. a recurring header) is
+        # embedded once; each chunk is still stored with its own metadata
+        first_index = {}
+        for i, content_hash in enumerate(hashes):
+            first_index.setdefault(content_hash, i)
+        claimed = [content_hash for content_hash in first_index if content_hash not in vectors]
+        loop = asyncio.get_running_loop()
+        for content_hash in claimed:
+            vectors[content_hash] = loop.create_future()
+        
+        missing = []
+        try:
+            if claimed:
+                stored = await asyncio.to_thread(self.embedding_cache.get, ids=claimed, include=["embeddings"])
+                known = dict(zip(stored["ids"], stored["embeddings"]))
+                missing = [content_hash for content_hash in claimed if content_hash not in known]
+                if missing:
+                    embeddings = await self.embedding_service.get_embeddings(
+                        [chunks[first_index[content_hash]] for content_hash in missing]
+                    )
+                    known.update(zip(missing, embeddings))
+                    await asyncio.to_thread(self.embedding_cache.upsert, ids=missing, embeddings=embeddings)
+                for content_hash in claimed:
+                    vectors[content_hash].set_result(known[content_hash])
+        except Exception as e:
+            for content_hash in claimed:
+                if not vectors[content_hash].done():
+                    vectors[content_hash].set_exception(e)
+            raise
+        finally:
+            # Cancelled before finishing; let other waiters fail rather than hang
+            for content_hash in claimed:
+                vectors[content_hash].cancel()
+        
+        if len(missing) < len(chunks):
+            logger.info("Embedded %d unique new chunks out of %d", len(missing), len(chunks))
+        unique = {content_hash: await vectors[content_hash] for content_hash in first_index}
+        return np.stack([unique[content_hash] for content_hash in hashes]).astype(np.float32, copy=False)
+    
+    async def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a single query with the same model used for stored chunks
+        Recent queries are served from memory without an API call
+        """
+        # Keyed by digest so long questions are not kept in memory
+        key = self._content_hash(query)
+        cached = self._query_embeddings.get(key)
+        if cached is not None:
+            self._query_embeddings.move_to_end(key)
+            return cached
+        
+        embedding = await self.embedding_service.embed_query(query)
+        
+        if self.query_cache_size > 0:
+            self._query_embeddings[key] = embedding
+            while len(self._query_embeddings) > self.query_cache_size:
+                self._query_embeddings.popitem(last=False)
+        return embedding
+    
+    async def search(
+        self,
+        query: str,
+        top_k: int = 3,
+        query_embedding: Optional[np.ndarray] = None,
+        metadata_filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the chunks closest to the query
+        metadata_filter is passed to Chroma as a `where` clause so the
+        filtering happens inside the index rather than on the results
+        """
+        if query_embedding is None:
+            query_embedding = await self.embed_query(query)
+        
+        # Chroma queries are blocking; keep the event loop free for other requests
+        results = await asyncio.to_thread(
+            self.collection.query,
+            query_embeddings=[query_embedding],
+            n_results=top_k,
+            where=metadata_filter,
+            include=["documents", "metadatas", "distances"]
         )
         
+        # Every result carries a metadata dict, so callers can index it directly
         documents = []
         if results['documents'] and results['documents'][0]:
+            metadatas = results['metadatas'][0] if results['metadatas'] else None
+            distances = results['distances'][0] if results['distances'] else None
             for i, doc in enumerate(results['documents'][0]):
                 documents.append({
                     "text": doc,
-                    "metadata": results['metadatas'][0][i] if results['metadatas'] else {},
-                    "distance": results['distances'][0][i] if results['distances'] else None
+                    "metadata": (metadatas[i] if metadatas else None) or {},
+                    "distance": distances[i] if distances else None
                 })
         
         return documents
     
     async def list_documents(self) -> List[Dict[str, Any]]:
-        all_data = self.collection.get()
+        # Every document has exactly one first chunk, so filtering on it
+        # yields one metadata row per document instead of one per chunk
+        first_chunks = await asyncio.to_thread(
+            self.collection.get,
+            where={"chunk_index": 0},
+            include=["metadatas"]
+        )
         
         doc_map = {}
-        for i, metadata in enumerate(all_data['metadatas'] or []):
+        for metadata in first_chunks['metadatas'] or []:
             doc_id = metadata.get('doc_id')
             if doc_id and doc_id not in doc_map:
                 doc_map[doc_id] = {
@@ -309,32 +306,57 @@ class VectorStoreService:
         return list(doc_map.values())
     
     async def delete_document(self, document_id: str):
-        all_data = self.collection.get()
-        
-        ids_to_delete = []
-        for i, metadata in enumerate(all_data['metadatas'] or []):
-            if metadata.get('doc_id') == document_id:
-                ids_to_delete.append(all_data['ids'][i])
-        
-        if ids_to_delete:
-            self.collection.delete(ids=ids_to_delete)
-            logger.info(f"Deleted {len(ids_to_delete)} chunks for document {document_id}")
+        # Let Chroma match the chunks by metadata rather than scanning them here
+        await asyncio.to_thread(self.collection.delete, where={"doc_id": document_id})
+        logger.info(f"Deleted chunks for document {document_id}")
+        await self._notify_change()
+    
+    async def _notify_change(self):
+        if self.on_change is not None:
+            await self.on_change()
     
     async def list_all_chunks(self) -> List[Dict[str, Any]]:
         """
         Get all chunks with their metadata and text
         Returns: List of dicts with 'text' and 'metadata' keys
         """
-        all_data = self.collection.get()
+        all_data = await asyncio.to_thread(
+            self.collection.get,
+            include=["documents", "metadatas"]
+        )
         
         chunks = []
         if all_data['documents']:
+            metadatas = all_data['metadatas']
             for i, doc in enumerate(all_data['documents']):
                 chunk = {
                     "text": doc,
-                    "metadata": all_data['metadatas'][i] if all_data['metadatas'] else {}
+                    "metadata": (metadatas[i] if metadatas else None) or {}
                 }
                 chunks.append(chunk)
         
         logger.info(f"Retrieved {len(chunks)} total chunks from collection")
-        return chunks
\ No newline at end of file
+        return chunks
+    
+    async def count_chunks(self) -> int:
+        """Number of chunks in the collection"""
+        return await asyncio.to_thread(self.collection.count)
+    
+    async def list_chunks_page(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """
+        Get one page of chunks, in the same order as list_all_chunks
+        Chroma applies offset and limit, so only the page is loaded
+        Returns: List of dicts with 'text' and 'metadata' keys
+        """
+        page_data = await asyncio.to_thread(
+            self.collection.get,
+            offset=offset,
+            limit=limit,
+            include=["documents", "metadatas"]
+        )
+        
+        metadatas = page_data['metadatas']
+        return [
+            {"text": doc, "metadata": (metadatas[i] if metadatas else None) or {}}
+            for i, doc in enumerate(page_data['documents'] or [])
+        ]
\ No newline at end of file
@@ -0,0 +1,33 @@
+from functools import lru_cache
+from typing import List
+import tiktoken
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """Load the tokenizer for a model once per process"""
+    return tiktoken.encoding_for_model(model)
+
+def fit_to_token_budget(texts: List[str], max_tokens: int, model: str, separator: str = "\n\n") -> List[str]:
+    """
+    Keep texts, in order, while their combined size fits in max_tokens
+    The first text is truncated rather than dropped so some context always remains
+    Returns: the texts that fit
+    """
+    encoding = get_encoding(model)
+    separator_tokens = len(encoding.encode(separator))
+
+    kept = []
+    used = 0
+    for text in texts:
+        tokens = encoding.encode(text)
+        cost = len(tokens) + (separator_tokens if kept else 0)
+        if used + cost <= max_tokens:
+            kept.append(text)
+            used += cost
+        elif not kept:
+            kept.append(encoding.decode(tokens[:max_tokens]))
+            break
+        else:
+            break
+
+    return kept
@@ -0,0 +1,35 @@
+from typing import BinaryIO, Tuple
+import os
+import tempfile
+from fastapi import HTTPException, UploadFile
+
+# Largest accepted upload; bigger files are rejected with 413
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+# Uploads are copied in 1 MiB reads and spill to disk past 8 MiB
+UPLOAD_READ_BYTES = 1 << 20
+UPLOAD_SPOOL_BYTES = 8 << 20
+
+async def read_upload(file: UploadFile) -> Tuple[BinaryIO, int]:
+    """
+    Copy an upload into a spooled temporary file in fixed-size reads,
+    rejecting it as soon as it grows past MAX_UPLOAD_BYTES
+    Returns: (file object positioned at the start, size in bytes)
+    """
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+    )
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise too_large
+    
+    buffer = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+    total = 0
+    while chunk := await file.read(UPLOAD_READ_BYTES):
+        total += len(chunk)
+        if total > MAX_UPLOAD_BYTES:
+            buffer.close()
+            raise too_large
+        buffer.write(chunk)
+    
+    buffer.seek(0)
+    return buffer, total
@@ -0,0 +1,17 @@
+import chromadb
+import pytest
+from chromadb.config import Settings
+from app.main import app
+from app.dependencies import clear_answer_caches, get_vector_store
+from app.services.vector_store import VectorStoreService
+
+@pytest.fixture(autouse=True, scope="session")
+def in_memory_vector_store():
+    """Serve the app from an in-memory Chroma client instead of ./data"""
+    vector_store = VectorStoreService(
+        client=chromadb.EphemeralClient(settings=Settings(anonymized_telemetry=False)),
+        on_change=clear_answer_caches
+    )
+    app.dependency_overrides[get_vector_store] = lambda: vector_store
+    yield vector_store
+    app.dependency_overrides.pop(get_vector_store, None)
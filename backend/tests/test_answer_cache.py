@@ -0,0 +1,29 @@
+import pytest
+from app.services.answer_cache import AnswerCache
+
+def test_answer_cache_normalizes_question():
+    """Test case and whitespace differences hit the same entry"""
+    cache = AnswerCache(max_size=4, ttl_seconds=60)
+    cache.put("What is  RAG?", "cached answer", [])
+
+    assert cache.get("what is rag?") == ("cached answer", [])
+    assert cache.get("What is RAG today?") is None
+
+def test_answer_cache_expires_entries():
+    """Test entries older than the TTL are not returned"""
+    cache = AnswerCache(max_size=4, ttl_seconds=0)
+    cache.put("What is RAG?", "cached answer", [])
+
+    assert cache.get("What is RAG?") is None
+
+def test_answer_cache_evicts_least_recently_used():
+    """Test the cache drops the least recently used entry when full"""
+    cache = AnswerCache(max_size=2, ttl_seconds=60)
+    cache.put("first", "1", [])
+    cache.put("second", "2", [])
+    cache.get("first")
+    cache.put("third", "3", [])
+
+    assert cache.get("second") is None
+    assert cache.get("first") == ("1", [])
+    assert cache.get("third") == ("3", [])
@@ -0,0 +1,23 @@
+import io
+from types import SimpleNamespace
+from PyPDF2 import PdfWriter
+import app.services.document_parser as document_parser
+from app.services.document_parser import pdf_page_count
+
+def _blank_pdf(pages):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(612, 792)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+def test_pdf_page_count_falls_back_to_pypdf2(monkeypatch):
+    """Test a PDF the native library rejects is still counted with PyPDF2"""
+    def reject(data):
+        raise RuntimeError("Failed to load document")
+
+    monkeypatch.setattr(document_parser, "pymupdf", None)
+    monkeypatch.setattr(document_parser, "pypdfium2", SimpleNamespace(PdfDocument=reject))
+
+    assert pdf_page_count(_blank_pdf(3)) == 3
@@ -0,0 +1,115 @@
+import asyncio
+from types import SimpleNamespace
+import numpy as np
+from app.services.embeddings import EmbeddingService
+
+class _FakeEmbeddings:
+    """Stands in for AsyncOpenAI().embeddings, encoding each text's length"""
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, model, input, dimensions):
+        self.calls.append(list(input))
+        # Later batches answer first, so results arrive out of order
+        await asyncio.sleep(0.01 / len(self.calls))
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(text)), 1.0]) for text in input])
+
+def _service(batch_size=96):
+    service = EmbeddingService()
+    service.embeddings = _FakeEmbeddings()
+    service.client = SimpleNamespace(embeddings=service.embeddings)
+    service.batch_size = batch_size
+    return service
+
+def _expected(texts):
+    vectors = np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def test_get_embeddings_keeps_input_order_across_batches():
+    """Test batched embeddings come back in the order the texts were given"""
+    service = _service(batch_size=3)
+    texts = ["x" * length for length in [5, 40, 1, 17, 300, 8, 62, 2]]
+
+    embeddings = asyncio.run(service.get_embeddings(texts))
+
+    assert len(service.embeddings.calls) == 3
+    # Batches are grouped by length, longest first
+    assert service.embeddings.calls[0] == ["x" * 300, "x" * 62, "x" * 40]
+    assert embeddings.dtype == np.float32
+    np.testing.assert_allclose(embeddings, _expected(texts), rtol=1e-6)
+
+def test_get_embeddings_single_batch():
+    """Test texts that fit in one batch are sent in one request, unsorted"""
+    service = _service()
+    texts = ["short", "a much longer text", "mid length"]
+
+    embeddings = asyncio.run(service.get_embeddings(texts))
+
+    assert service.embeddings.calls == [texts]
+    np.testing.assert_allclose(embeddings, _expected(texts), rtol=1e-6)
+
+def test_concurrent_queries_share_one_request():
+    """Test queries embedded together are sent in one request and each gets its own vector"""
+    service = _service()
+    service.query_batch_window = 0.005
+    questions = ["What is RAG?", "How are chunks stored?", "Why?"]
+
+    async def ask_all():
+        return await asyncio.gather(*(service.embed_query(question) for question in questions))
+
+    embeddings = asyncio.run(ask_all())
+
+    assert service.embeddings.calls == [questions]
+    np.testing.assert_allclose(np.stack(embeddings), _expected(questions), rtol=1e-6)
+
+def test_failed_query_batch_raises_in_every_caller():
+    """Test a failed shared request reaches every waiting query instead of leaving it hanging"""
+    service = _service()
+    service.query_batch_window = 0.005
+
+    async def fail(model, input, dimensions):
+        raise RuntimeError("rate limited")
+
+    service.client = SimpleNamespace(embeddings=SimpleNamespace(create=fail))
+
+    async def ask_all():
+        return await asyncio.wait_for(
+            asyncio.gather(
+                *(service.embed_query(question) for question in ["first", "second"]),
+                return_exceptions=True
+            ),
+            timeout=5
+        )
+
+    results = asyncio.run(ask_all())
+
+    assert len(results) == 2
+    for result in results:
+        assert isinstance(result, Exception)
+        assert "rate limited" in str(result)
+
+def test_query_does_not_wait_for_ingestion():
+    """Test a question is embedded while document batches hold every ingestion slot"""
+    service = _service(batch_size=1)
+    release = asyncio.Event()
+
+    async def create(model, input, dimensions):
+        # Document batches stall until the question has its embedding
+        if input != ["question"]:
+            await release.wait()
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(text)), 1.0]) for text in input])
+
+    service.client = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+
+    async def ingest_and_ask():
+        service._semaphore = asyncio.Semaphore(1)
+        ingestion = asyncio.create_task(service.get_embeddings([f"chunk {i}" for i in range(10)]))
+        await asyncio.sleep(0)
+        embedding = await asyncio.wait_for(service.embed_query("question"), timeout=1)
+        release.set()
+        await ingestion
+        return embedding
+
+    embedding = asyncio.run(ingest_and_ask())
+
+    np.testing.assert_allclose(embedding, _expected(["question"])[0], rtol=1e-6)
@@ -1,6 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
-from app.main import app
+from app.main import app, _dedupe_chunks
 
 client = TestClient(app)
 
@@ -51,4 +51,26 @@ def test_ask_empty_question():
     )
     
     # Should handle empty question gracefully
-    assert response.status_code in [200, 500]
\ No newline at end of file
+    assert response.status_code in [200, 500]
+
+def test_ask_stream_malformed_request():
+    """Test malformed request to the streaming endpoint"""
+    response = client.post(
+        "/ask/stream",
+        json={}
+    )
+    
+    assert response.status_code == 422
+
+def test_dedupe_chunks():
+    """Test repeated chunks are dropped, keeping the first occurrence"""
+    chunks = [
+        {"text": "a", "metadata": {"filename": "doc.pdf", "chunk_index": 0}},
+        {"text": "b", "metadata": {"filename": "doc.pdf", "chunk_index": 1}},
+        {"text": "a again", "metadata": {"filename": "doc.pdf", "chunk_index": 0}},
+        {"text": "c", "metadata": {"filename": "other.pdf", "chunk_index": 0}}
+    ]
+    
+    deduped = _dedupe_chunks(chunks)
+    
+    assert [chunk["text"] for chunk in deduped] == ["a", "b", "c"]
\ No newline at end of file
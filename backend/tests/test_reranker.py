@@ -0,0 +1,34 @@
+import asyncio
+import pytest
+from app.services.reranker import RerankerService
+
+class ScoreInTextModel:
+    """Stand-in cross-encoder scoring chunks by the scores embedded in their text"""
+    def predict(self, pairs, batch_size=32):
+        return [float(text.split(":")[1]) for _, text in pairs]
+
+def make_reranker(confidence=0.8):
+    reranker = RerankerService()
+    reranker.model_name = "test-model"
+    reranker.confidence = confidence
+    reranker._model = ScoreInTextModel()
+    return reranker
+
+def test_reranker_disabled_by_default(monkeypatch):
+    """Test reranking is off unless a model is configured"""
+    monkeypatch.delenv("RERANKER_MODEL", raising=False)
+    assert not RerankerService().enabled
+
+def test_reranker_orders_by_score():
+    """Test chunks are reordered by cross-encoder score and cut to top_k"""
+    chunks = [{"text": "a:0.1"}, {"text": "b:0.5"}, {"text": "c:0.3"}]
+    result = asyncio.run(make_reranker().rerank("question", chunks, top_k=2))
+
+    assert [chunk["text"] for chunk in result] == ["b:0.5", "c:0.3"]
+
+def test_reranker_keeps_only_confident_chunks():
+    """Test a confident match drops the weaker candidates"""
+    chunks = [{"text": "a:0.1"}, {"text": "b:0.95"}, {"text": "c:0.3"}]
+    result = asyncio.run(make_reranker().rerank("question", chunks, top_k=3))
+
+    assert [chunk["text"] for chunk in result] == ["b:0.95"]
@@ -0,0 +1,35 @@
+import asyncio
+import pytest
+from app.services.semantic_cache import SemanticCache
+
+def test_cache_miss_when_empty():
+    """Test lookup on an empty cache returns nothing"""
+    cache = SemanticCache(threshold=0.9, max_size=4)
+    assert cache.lookup([1.0, 0.0, 0.0]) is None
+
+def test_cache_hit_for_similar_embedding():
+    """Test a near-identical question reuses the cached answer"""
+    cache = SemanticCache(threshold=0.9, max_size=4)
+    asyncio.run(cache.add([1.0, 0.0, 0.0], "cached answer", []))
+
+    assert cache.lookup([0.99, 0.05, 0.0]) == ("cached answer", [])
+    assert cache.lookup([0.0, 1.0, 0.0]) is None
+
+def test_cache_evicts_oldest_entry():
+    """Test the cache keeps at most max_size entries in FIFO order"""
+    cache = SemanticCache(threshold=0.9, max_size=2)
+    asyncio.run(cache.add([1.0, 0.0, 0.0], "first", []))
+    asyncio.run(cache.add([0.0, 1.0, 0.0], "second", []))
+    asyncio.run(cache.add([0.0, 0.0, 1.0], "third", []))
+
+    assert cache.lookup([1.0, 0.0, 0.0]) is None
+    assert cache.lookup([0.0, 1.0, 0.0]) == ("second", [])
+    assert cache.lookup([0.0, 0.0, 1.0]) == ("third", [])
+
+def test_cache_clear():
+    """Test clearing drops all cached answers"""
+    cache = SemanticCache(threshold=0.9, max_size=4)
+    asyncio.run(cache.add([1.0, 0.0, 0.0], "cached answer", []))
+    asyncio.run(cache.clear())
+
+    assert cache.lookup([1.0, 0.0, 0.0]) is None
@@ -0,0 +1,42 @@
+import pytest
+import app.utils.tokens as tokens
+from app.utils.tokens import fit_to_token_budget
+
+class _WordEncoding:
+    """Counts space-separated words as tokens; tiktoken's encodings need a download"""
+    def encode(self, text):
+        return text.split(" ")
+
+    def decode(self, words):
+        return " ".join(words)
+
+@pytest.fixture(autouse=True)
+def word_encoding(monkeypatch):
+    monkeypatch.setattr(tokens, "get_encoding", lambda model: _WordEncoding())
+
+# Three chunks of 3, 2 and 4 tokens; each separator costs one token
+CHUNKS = ["one two three", "four five", "six seven eight nine"]
+
+def test_keeps_chunks_exactly_at_budget():
+    """Test chunks whose total, separators included, equals the budget are all kept"""
+    assert fit_to_token_budget(CHUNKS, 3 + 1 + 2 + 1 + 4, "gpt-4o-mini") == CHUNKS
+
+def test_drops_chunk_one_token_over_budget():
+    """Test a chunk that would exceed the budget by one token is dropped"""
+    assert fit_to_token_budget(CHUNKS, 3 + 1 + 2 + 1 + 4 - 1, "gpt-4o-mini") == CHUNKS[:2]
+
+def test_truncates_first_chunk_over_budget():
+    """Test a first chunk larger than the whole budget is truncated rather than dropped"""
+    assert fit_to_token_budget(["a b c d e f", "g h"], 4, "gpt-4o-mini") == ["a b c d"]
+
+def test_keeps_chunks_in_given_order():
+    """Test kept chunks stay in ranked order, not sorted by size"""
+    chunks = ["c d e", "a", "b f"]
+
+    assert fit_to_token_budget(chunks, 20, "gpt-4o-mini") == chunks
+
+def test_stops_at_first_chunk_that_does_not_fit():
+    """Test a smaller, lower-ranked chunk does not skip ahead of one that did not fit"""
+    chunks = ["one two", "three four five six", "seven"]
+
+    assert fit_to_token_budget(chunks, 4, "gpt-4o-mini") == ["one two"]
@@ -1,6 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
 import os
+import app.main as main
 from app.main import app
 
 client = TestClient(app)
@@ -16,17 +17,26 @@ def test_upload_doc_txt():
     
     response = client.post("/upload-doc", files=files)
     
-    # Should fail without OpenAI API key in test environment
-    assert response.status_code in [200, 500]  # Allow both success and expected failure
+    # Processing happens in the background, so the upload is accepted immediately
+    assert response.status_code == 202
+    data = response.json()
+    assert "document_id" in data
+    assert "chunks_stored" in data
+    assert data["filename"] == "test.txt"
+    
+    # Background processing may fail without OpenAI API key in test environment
+    status_response = client.get(f"/upload-doc/{data['document_id']}/status")
+    assert status_response.status_code == 200
+    status_data = status_response.json()
+    assert status_data["status"] in ["completed", "failed"]
+    if status_data["status"] == "failed":
+        assert status_data["error"]
+
+def test_upload_doc_status_unknown_id():
+    """Test polling the status of an unknown document"""
+    response = client.get("/upload-doc/does-not-exist/status")
     
-    if response.status_code == 200:
-        data = response.json()
-        assert "document_id" in data
-        assert "chunks_stored" in data
-        assert data["filename"] == "test.txt"
-    else:
-        # Expected failure without proper OpenAI setup
-        assert "error" in response.json() or "detail" in response.json()
+    assert response.status_code == 404
 
 def test_upload_doc_invalid_type():
     """Test uploading an invalid file type"""
@@ -50,4 +60,40 @@ def test_upload_doc_empty_file():
     
     assert response.status_code == 400
     data = response.json()
-    assert "Empty file" in data["detail"]
\ No newline at end of file
+    assert "Empty file" in data["detail"]
+
+def test_upload_doc_too_large(monkeypatch):
+    """Test uploading a file over the size limit"""
+    monkeypatch.setattr("app.utils.uploads.MAX_UPLOAD_BYTES", 10)
+    files = {
+        "file": ("big.txt", b"x" * 100, "text/plain")
+    }
+    
+    response = client.post("/upload-doc", files=files)
+    
+    assert response.status_code == 413
+    data = response.json()
+    assert "too large" in data["detail"]
+
+def test_legacy_upload_too_large(monkeypatch):
+    """Test the legacy upload route enforces the same size limit"""
+    monkeypatch.setattr("app.utils.uploads.MAX_UPLOAD_BYTES", 10)
+    files = {
+        "file": ("big.txt", b"x" * 100, "text/plain")
+    }
+    
+    response = client.post("/api/documents/upload", files=files)
+    
+    assert response.status_code == 413
+    assert "too large" in response.json()["detail"]
+
+def test_upload_status_evicts_finished_uploads_first(monkeypatch):
+    """Test tracked upload statuses stay bounded and in-flight ones survive eviction"""
+    monkeypatch.setattr(main, "UPLOAD_STATUS_SIZE", 2)
+    monkeypatch.setattr(main, "upload_status", main.OrderedDict())
+
+    main._track_upload(main.UploadStatusResponse(document_id="a", filename="a.txt", status="processing"))
+    main._track_upload(main.UploadStatusResponse(document_id="b", filename="b.txt", status="completed"))
+    main._track_upload(main.UploadStatusResponse(document_id="c", filename="c.txt", status="processing"))
+
+    assert list(main.upload_status) == ["a", "c"]
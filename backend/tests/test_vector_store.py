@@ -0,0 +1,121 @@
+import asyncio
+import io
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from PyPDF2 import PdfWriter
+from app.dependencies import get_answer_cache, get_semantic_cache
+import app.services.document_parser as document_parser
+import app.services.vector_store as vector_store_module
+
+class _Splitter:
+    """Stands in for the tiktoken splitter, whose encoding needs a download"""
+    def split_text(self, text):
+        return [text] if text else []
+
+@pytest.fixture
+def store(in_memory_vector_store, monkeypatch):
+    """The shared in-memory store, with embedding calls recorded instead of sent"""
+    calls = []
+
+    async def fake_embeddings(texts):
+        calls.append(list(texts))
+        return np.array([[float(len(text)), 1.0, 0.0] for text in texts], dtype=np.float32)
+
+    monkeypatch.setattr(in_memory_vector_store.embedding_service, "get_embeddings", fake_embeddings)
+    monkeypatch.setattr(document_parser, "get_text_splitter", lambda: _Splitter())
+    in_memory_vector_store.embedding_calls = calls
+    return in_memory_vector_store
+
+def _blank_pdf(pages):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+def test_long_pdf_without_text_reports_no_content(store, monkeypatch):
+    """Test a long fine-grained PDF with no text fails with the parser's message"""
+    monkeypatch.setattr(vector_store_module, "PDF_PAGES_PER_TASK", 1)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        monkeypatch.setattr(vector_store_module, "get_parse_pool", lambda: pool)
+        with pytest.raises(ValueError, match="No text content could be extracted"):
+            asyncio.run(store.add_document(io.BytesIO(_blank_pdf(3)), "index.pdf", "application/pdf"))
+    assert store.embedding_calls == []
+
+def test_delete_clears_answer_caches(store):
+    """Test deleting a document drops answers cached from it"""
+    semantic_cache = get_semantic_cache()
+    asyncio.run(semantic_cache.add([1.0, 0.0, 0.0], "stale answer", []))
+    answer_cache = get_answer_cache()
+    answer_cache.put("What is stale?", "stale answer", [])
+
+    asyncio.run(store.delete_document("no-such-document"))
+
+    assert semantic_cache.lookup([1.0, 0.0, 0.0]) is None
+    assert answer_cache.get("What is stale?") is None
+
+def _stored_embeddings(store, doc_id):
+    stored = store.collection.get(where={"doc_id": doc_id}, include=["embeddings"])
+    return np.array(stored["embeddings"])
+
+def test_reupload_reuses_stored_embeddings(store, monkeypatch):
+    """Test re-adding a document's exact text reuses its vectors instead of embedding again"""
+    monkeypatch.setattr(vector_store_module, "get_parse_pool", lambda: None)
+    text = f"Reusable chunk {uuid.uuid4()}"
+
+    first_id, _ = asyncio.run(store.add_document(io.BytesIO(text.encode()), "first.txt", "text/plain"))
+    assert len(store.embedding_calls) == 1
+    second_id, _ = asyncio.run(store.add_document(io.BytesIO(text.encode()), "second.txt", "text/plain"))
+
+    assert len(store.embedding_calls) == 1
+    np.testing.assert_array_equal(_stored_embeddings(store, second_id), _stored_embeddings(store, first_id))
+
+def test_embed_chunks_empty(store):
+    """Test embedding no chunks skips both the stored-vector lookup and the embedder"""
+    embeddings = asyncio.run(store._embed_chunks([], []))
+
+    assert embeddings.shape[0] == 0
+    assert embeddings.dtype == np.float32
+    assert store.embedding_calls == []
+
+def test_repeated_uploads_fetch_one_vector_per_chunk(store, monkeypatch):
+    """Test the reuse lookup reads one stored vector per unique chunk, not one per stored copy"""
+    monkeypatch.setattr(vector_store_module, "get_parse_pool", lambda: None)
+    text = f"Often uploaded chunk {uuid.uuid4()}"
+    fetched = []
+    get = store.embedding_cache.get
+
+    def counting_get(*args, **kwargs):
+        result = get(*args, **kwargs)
+        fetched.append(len(result["ids"]))
+        return result
+
+    monkeypatch.setattr(store.embedding_cache, "get", counting_get)
+    for _ in range(4):
+        asyncio.run(store.add_document(io.BytesIO(text.encode()), "repeat.txt", "text/plain"))
+
+    assert fetched == [0, 1, 1, 1]
+    assert len(store.embedding_calls) == 1
+
+def test_long_pdf_embeds_repeated_line_once(store, monkeypatch):
+    """Test a line repeated on every page is embedded once, though each page is its own range"""
+    header = f"Repeated running header on every single page {uuid.uuid4()}"
+
+    def page_texts(parser, content, start=0, stop=None):
+        return [f"{header}\nBody text that only appears on page number {page} of this document" for page in range(start, stop)]
+
+    monkeypatch.setattr(document_parser.DocumentParser, "_pdf_page_texts", page_texts)
+    monkeypatch.setattr(vector_store_module, "pdf_page_count", lambda data: 3)
+    monkeypatch.setattr(vector_store_module, "PDF_PAGES_PER_TASK", 1)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        monkeypatch.setattr(vector_store_module, "get_parse_pool", lambda: pool)
+        _, chunk_count = asyncio.run(store.add_document(io.BytesIO(b"%PDF"), "index.pdf", "application/pdf"))
+
+    embedded = [text for call in store.embedding_calls for text in call]
+    assert chunk_count == 6
+    assert embedded.count(header) == 1
+    assert len(embedded) == 4
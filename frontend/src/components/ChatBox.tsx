@@ -1,5 +1,4 @@
 import { useState, useRef, useEffect } from 'react'
-import axios from 'axios'
 import { config } from '../config'
 
 interface Source {
@@ -11,6 +10,15 @@ interface Source {
   score: number
 }
 
+class StreamError extends Error {
+  status: number
+
+  constructor(status: number) {
+    super(`Request failed with status ${status}`)
+    this.status = status
+  }
+}
+
 interface ChatMessage {
   id: string
   type: 'user' | 'ai'
@@ -42,6 +50,63 @@ function ChatBox() {
       timestamp: new Date()
     }
     setMessages(prev => [...prev, newMessage])
+    return newMessage.id
+  }
+
+  const updateMessage = (id: string, update: (message: ChatMessage) => ChatMessage) => {
+    setMessages(prev => prev.map(message => (message.id === id ? update(message) : message)))
+  }
+
+  // Read the /ask/stream Server-Sent Events: sources arrive first, then the
+  // answer token by token, so the reply appears as soon as generation starts
+  const streamAnswer = async (question: string) => {
+    const response = await fetch(
+      `${config.API_BASE_URL}${config.endpoints.askStream}`,
+      {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ question })
+      }
+    )
+    if (!response.ok || !response.body) {
+      throw new StreamError(response.status)
+    }
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    let answerId: string | null = null
+    let sources: Source[] | undefined
+
+    while (true) {
+      const { done, value } = await reader.read()
+      if (done) break
+
+      buffer += decoder.decode(value, { stream: true })
+      const events = buffer.split('\n\n')
+      buffer = events.pop() ?? ''
+
+      for (const event of events) {
+        if (!event.startsWith('data: ')) continue
+        const data = JSON.parse(event.slice('data: '.length))
+
+        if (data.error) {
+          throw new StreamError(500)
+        } else if (data.sources) {
+          const latest: Source[] = data.sources
+          sources = latest
+          if (answerId) updateMessage(answerId, message => ({ ...message, sources: latest }))
+        } else if (data.token !== undefined) {
+          if (answerId === null) {
+            answerId = addMessage('ai', data.token, sources)
+            setLoading(false)
+          } else {
+            const token: string = data.token
+            updateMessage(answerId, message => ({ ...message, content: message.content + token }))
+          }
+        }
+      }
+    }
   }
 
   const handleSubmit = async (e: React.FormEvent<HTMLFormElement>) => {
@@ -57,26 +122,21 @@ function ChatBox() {
     setLoading(true)
 
     try {
-      const response = await axios.post(
-        `${config.API_BASE_URL}${config.endpoints.ask}`,
-        { question }
-      )
-      
-      // Add AI response
-      addMessage('ai', response.data.answer, response.data.sources)
+      await streamAnswer(question)
       
     } catch (err: unknown) {
       console.error('Error calling API:', err)
       
       // Handle different error scenarios
-      if (axios.isAxiosError(err)) {
-        if (err.response?.status === 500) {
+      if (err instanceof StreamError) {
+        if (err.status === 500) {
           addMessage('ai', 'Sorry, I encountered an error while processing your question. Please make sure the backend is running and configured properly.')
-        } else if (err.code === 'ECONNREFUSED') {
-          addMessage('ai', 'Cannot connect to the backend server. Please make sure it is running on localhost:8000.')
         } else {
           addMessage('ai', 'Server error occurred. Please try again later.')
         }
+      } else if (err instanceof TypeError) {
+        // fetch rejects with a TypeError when the server cannot be reached
+        addMessage('ai', 'Cannot connect to the backend server. Please make sure it is running on localhost:8000.')
       } else {
         addMessage('ai', 'Something went wrong. Please try again later.')
       }
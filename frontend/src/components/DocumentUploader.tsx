@@ -10,6 +10,14 @@ interface UploadedDoc {
   timestamp: Date
 }
 
+interface UploadStatus {
+  document_id: string
+  filename: string
+  status: 'processing' | 'completed' | 'failed'
+  chunks_stored: number
+  error?: string | null
+}
+
 interface ToastMessage {
   id: string
   message: string
@@ -57,6 +65,36 @@ function DocumentUploader() {
     await uploadFile(file)
   }
 
+  const waitForProcessing = async (documentId: string, filename: string): Promise<UploadStatus> => {
+    const failed = (error: string): UploadStatus => ({
+      document_id: documentId,
+      filename,
+      status: 'failed',
+      chunks_stored: 0,
+      error
+    })
+
+    // Poll once a second for up to 5 minutes
+    for (let attempt = 0; attempt < 300; attempt++) {
+      try {
+        const response = await axios.get<UploadStatus>(
+          `${config.API_BASE_URL}/upload-doc/${documentId}/status`
+        )
+        if (response.data.status !== 'processing') {
+          return response.data
+        }
+      } catch (error: unknown) {
+        // The backend restarted or forgot this upload; it will never finish
+        if (axios.isAxiosError(error) && error.response?.status === 404) {
+          return failed('The server lost track of this upload. Please try again.')
+        }
+        throw error
+      }
+      await new Promise(resolve => setTimeout(resolve, 1000))
+    }
+    return failed('Document processing timed out. Check the document list before retrying.')
+  }
+
   const uploadFile = async (file: File) => {
     setUploading(true)
 
@@ -74,15 +112,24 @@ function DocumentUploader() {
         }
       )
 
+      // The backend indexes documents in the background; poll until it finishes
+      addToast(`Processing "${file.name}"...`, 'info')
+      const status = await waitForProcessing(response.data.document_id, file.name)
+
+      if (status.status === 'failed') {
+        addToast(status.error || 'Document processing failed', 'error')
+        return
+      }
+
       const newDoc: UploadedDoc = {
-        id: response.data.document_id,
-        filename: response.data.filename,
-        chunks: response.data.chunks_stored,
+        id: status.document_id,
+        filename: status.filename,
+        chunks: status.chunks_stored,
         timestamp: new Date()
       }
 
       setUploadedDocs(prev => [...prev, newDoc])
-      addToast(`Successfully uploaded "${file.name}" (${response.data.chunks_stored} chunks)`, 'success')
+      addToast(`Successfully uploaded "${file.name}" (${status.chunks_stored} chunks)`, 'success')
 
       // Reset file input
       if (fileInputRef.current) {
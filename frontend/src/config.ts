@@ -1,6 +1,7 @@
 export const config = {
   API_BASE_URL: 'http://localhost:8000',
   endpoints: {
-    ask: '/ask'
+    ask: '/ask',
+    askStream: '/ask/stream'
   }
 }
\ No newline at end of file